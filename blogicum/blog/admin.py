@@ -1,5 +1,5 @@
 from django.contrib import admin
-from blog.models import Category, Location, Post, Comment
+from blog.models import Category, Location, Post, Comment, Task
 
 
 # Register your models here.
@@ -7,3 +7,4 @@ admin.site.register(Category)
 admin.site.register(Location)
 admin.site.register(Post)
 admin.site.register(Comment)
+admin.site.register(Task)
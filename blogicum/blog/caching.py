@@ -0,0 +1,377 @@
+import hashlib
+import time
+import uuid
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Min
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .routers import reading_from_replica
+
+# Время (Unix time) последнего сброса кэша после записи в БД
+LAST_WRITE_KEY = 'blog:last-write'
+
+
+def get_cache():
+    """Возвращает кэш блога (алиас из настройки BLOG_CACHE_ALIAS)."""
+
+    return caches[getattr(settings, 'BLOG_CACHE_ALIAS', 'default')]
+
+
+def repeat_after_commit(func, *args):
+    """
+    Повторяет сброс кэша после фиксации текущей транзакции. До нее
+    другие запросы читают старые данные и могут сохранить их под уже
+    новыми метками версий; повтор после фиксации делает такие записи
+    недостижимыми. Сброс до фиксации остается, чтобы сама транзакция
+    (и тесты, где она не фиксируется) видели изменения.
+    """
+
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(func, *args))
+
+
+def feed_count_key(feed):
+    """
+    Ключ кэша общего числа постов ленты.
+    Args:
+        feed: Имя ленты: 'index', 'category:<id>', 'author:<id>',
+            'author:<id>:all' (лента автора со всеми его постами)
+            или 'all' (все посты, для IDF поиска)
+    """
+
+    return f'blog:feed-count:{feed}'
+
+
+def get_feed_count(feed, compute):
+    """
+    Возвращает число постов ленты из кэша, вычисляя его при промахе.
+    Args:
+        feed: Имя ленты
+        compute: Функция без аргументов, выполняющая COUNT
+    """
+
+    cache = get_cache()
+    key = feed_count_key(feed)
+    count = cache.get(key)
+    if count is None:
+        count = compute()
+        if not replica_may_be_stale():
+            cache.set(
+                key, count, getattr(settings, 'BLOG_FEED_COUNT_TIMEOUT', 60)
+            )
+    return count
+
+
+def _delete_feed_counts(feeds):
+    cache = get_cache()
+    cache.delete_many([feed_count_key(feed) for feed in feeds])
+    cache.set(LAST_WRITE_KEY, time.time(), None)
+
+
+def invalidate_feed_counts(*feeds):
+    """
+    Сбрасывает закэшированные счётчики перечисленных лент сейчас
+    и еще раз после фиксации транзакции (см. repeat_after_commit).
+    """
+
+    _delete_feed_counts(feeds)
+    repeat_after_commit(_delete_feed_counts, feeds)
+
+
+def replica_may_be_stale():
+    """
+    Может ли реплика, с которой читает запрос, еще не содержать
+    последней записи: с нее прошло меньше BLOG_PRIMARY_STICKY_SECONDS
+    (допустимого отставания реплики). Прочитанное в это время не
+    кэшируется, иначе старые данные сохранились бы под новыми метками
+    версий и отдавались бы всем до следующего изменения.
+    """
+
+    if not reading_from_replica():
+        return False
+    # Без метки (вытеснена из кэша) реплика считается отстающей
+    last_write = get_cache().get_or_set(LAST_WRITE_KEY, time.time, None)
+    lag = getattr(settings, 'BLOG_PRIMARY_STICKY_SECONDS', 5)
+    return time.time() - last_write < lag
+
+
+def version_key(name):
+    return f'blog:version:{name}'
+
+
+def get_versions(*names):
+    """
+    Возвращает текущие метки версий объектов одним обращением к кэшу.
+    Отсутствующие метки создаются заново: новая случайная метка не
+    совпадет ни с одной, под которой раньше сохранялись фрагменты.
+    Args:
+        names: Имена объектов вида 'post:<id>', 'category:<id>'
+    Returns:
+        Словарь {имя: метка}
+    """
+
+    cache = get_cache()
+    keys = {version_key(name): name for name in names}
+    found = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def _set_new_versions(names):
+    get_cache().set_many({
+        LAST_WRITE_KEY: time.time(),
+        **{version_key(name): uuid.uuid4().hex for name in names},
+    }, None)
+
+
+def bump_versions(*names):
+    """
+    Выдает объектам новые метки версий, делая их фрагменты устаревшими.
+    Внутри транзакции метки меняются еще раз после ее фиксации
+    (см. repeat_after_commit).
+    """
+
+    _set_new_versions(names)
+    repeat_after_commit(_set_new_versions, names)
+
+
+class PublishedChoices:
+    """
+    Кэш пар (id, название) опубликованных объектов в памяти процесса.
+    Актуальность сверяется с меткой версии в общем кэше: сигналы модели
+    меняют метку, и при следующем обращении каждый процесс перечитывает
+    список одним запросом. Пока метка не изменилась, к БД не обращаются.
+    Attributes:
+        model: Модель с полем is_published
+        label_field: Поле с названием для списка
+        version_name: Имя метки версии, например 'choices:category'
+    """
+
+    def __init__(self, model, label_field, version_name):
+        self.model = model
+        self.label_field = label_field
+        self.version_name = version_name
+        # (метка версии, список пар, словарь id -> название) заменяется
+        # целиком, поэтому потоки видят согласованное состояние
+        self._state = (None, [], {})
+
+    def _current(self):
+        version = get_versions(self.version_name)[self.version_name]
+        state = self._state
+        if state[0] != version:
+            pairs = list(
+                self.model.objects.filter(is_published=True)
+                .order_by('pk').values_list('pk', self.label_field)
+            )
+            state = (version, pairs, dict(pairs))
+            self._state = state
+        return state
+
+    def pairs(self):
+        """Список пар (id, название) в порядке id."""
+
+        return self._current()[1]
+
+    def get(self, pk):
+        """
+        Несохраняемый экземпляр модели с id и названием или None,
+        если объекта с таким id нет среди опубликованных.
+        """
+
+        labels = self._current()[2]
+        if pk not in labels:
+            return None
+        instance = self.model(pk=pk, is_published=True)
+        setattr(instance, self.label_field, labels[pk])
+        instance._state.adding = False
+        return instance
+
+
+def post_card_dependencies(post):
+    """Имена объектов, от которых зависит HTML карточки поста."""
+
+    return (
+        f'post:{post.id}',
+        f'category:{post.category_id}',
+        f'location:{post.location_id}',
+        f'user:{post.author_id}',
+    )
+
+
+def render_post_cards(posts, template_name='includes/post_card.html'):
+    """
+    Рендерит карточки постов ленты, используя кэш фрагментов.
+    Ключ карточки состоит из id поста и хэша меток версий поста,
+    его категории, местоположения и автора, а также числа комментариев.
+    HTML карточки сохраняется в атрибут card_html каждого поста.
+    Args:
+        posts: Посты текущей страницы (Page или список)
+        template_name: Шаблон карточки
+    Returns:
+        Тот же объект posts
+    """
+
+    cache = get_cache()
+    post_list = list(posts)
+    versions = get_versions(*{
+        name for post in post_list for name in post_card_dependencies(post)
+    })
+    keys = {}
+    for post in post_list:
+        stamp = ':'.join(
+            [versions[name] for name in post_card_dependencies(post)]
+            + [str(post.comment_count)]
+        )
+        digest = hashlib.md5(stamp.encode()).hexdigest()
+        keys[post.id] = f'blog:post-card:{post.id}:{digest}'
+    cached = cache.get_many(keys.values())
+    rendered = {}
+    for post in post_list:
+        key = keys[post.id]
+        html = cached.get(key)
+        if html is None:
+            html = render_to_string(template_name, {'post': post})
+            rendered[key] = html
+        post.card_html = mark_safe(html)
+    if rendered and not replica_may_be_stale():
+        cache.set_many(
+            rendered, getattr(settings, 'BLOG_POST_CARD_TIMEOUT', 86400)
+        )
+    return posts
+
+
+FEED_CLOCK_KEY = 'blog:feed-valid-until'
+
+
+def next_publication():
+    """
+    Дата ближайшей отложенной публикации видимого поста или None.
+    Минимум берется из частичного индекса feed_visible_pub_date_idx.
+    """
+
+    from .models import FeedEntry
+
+    return FeedEntry.objects.filter(
+        is_visible=True, pub_date__gt=timezone.now()
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+
+
+def feed_valid_until():
+    """
+    Момент, до которого ленты не меняются сами по себе (без сохранения
+    моделей): дата ближайшей отложенной публикации или None.
+    Значение хранится в кэше до этого момента и сбрасывается
+    reset_feed_clock() при изменении постов и категорий.
+    """
+
+    cache = get_cache()
+    cached = cache.get(FEED_CLOCK_KEY)
+    if cached is not None and (
+        cached[0] is None or cached[0] > timezone.now()
+    ):
+        return cached[0]
+    valid_until = next_publication()
+    if replica_may_be_stale():
+        return valid_until
+    timeout = getattr(settings, 'BLOG_FEED_CLOCK_TIMEOUT', 3600)
+    if valid_until is not None:
+        timeout = min(
+            timeout,
+            max(1, int((valid_until - timezone.now()).total_seconds()))
+        )
+    cache.set(FEED_CLOCK_KEY, (valid_until,), timeout)
+    return valid_until
+
+
+def _delete_feed_clock():
+    get_cache().delete(FEED_CLOCK_KEY)
+
+
+def reset_feed_clock():
+    """Сбрасывает закэшированный момент ближайшей публикации."""
+
+    _delete_feed_clock()
+    repeat_after_commit(_delete_feed_clock)
+
+
+def seconds_until_next_publication():
+    """
+    Возвращает число секунд до ближайшей отложенной публикации
+    или None, если отложенных постов нет.
+    """
+
+    valid_until = feed_valid_until()
+    if valid_until is None:
+        return None
+    return (valid_until - timezone.now()).total_seconds()
+
+
+def page_cache_key(request, versions):
+    """Ключ страницы: путь, номер страницы (или курсор) и метки версий."""
+
+    location = ':'.join((
+        request.path,
+        request.GET.get('page', ''),
+        request.GET.get('after', ''),
+    ))
+    stamp = ':'.join(versions[name] for name in sorted(versions))
+    digest = hashlib.md5(f'{location}|{stamp}'.encode()).hexdigest()
+    return f'blog:page:{digest}'
+
+
+def cache_anonymous_page(dependencies):
+    """
+    Декоратор view: кэширует страницу целиком для анонимных GET-запросов.
+    Страница хранится под метками версий объектов, от которых зависит,
+    поэтому сбрасывается сигналами моделей, а не только по TTL. Время
+    жизни не превышает BLOG_PAGE_CACHE_TIMEOUT и срока до ближайшей
+    отложенной публикации; при значении 0 кэш отключён. Страницы,
+    прочитанные с возможно отстающей реплики, не кэшируются.
+    Args:
+        dependencies: Функция от аргументов view, возвращающая имена
+            версий страницы, например ('feed:index',). Версия 'global'
+            добавляется всегда.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 0)
+            if (
+                not timeout or request.method != 'GET'
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            cache = get_cache()
+            versions = get_versions('global', *dependencies(*args, **kwargs))
+            key = page_cache_key(request, versions)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if (
+                response.status_code == 200 and not response.streaming
+                and not response.cookies
+            ):
+                next_publication = seconds_until_next_publication()
+                if next_publication is not None:
+                    timeout = min(timeout, int(next_publication))
+                if timeout > 0 and not replica_may_be_stale():
+                    cache.set(
+                        key, (response.content, response['Content-Type']),
+                        timeout
+                    )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,49 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# PRAGMA, которые можно задать в BLOG_SQLITE_PRAGMAS: имя подставляется
+# в SQL, поэтому допускаются только известные настройки производительности
+SQLITE_PRAGMAS = frozenset((
+    'journal_mode', 'synchronous', 'mmap_size', 'cache_size',
+    'busy_timeout', 'temp_store', 'wal_autocheckpoint', 'foreign_keys',
+))
+_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+def sqlite_pragma_statements(pragmas):
+    """
+    Команды PRAGMA для словаря {имя: значение}.
+    Raises:
+        ImproperlyConfigured: Неизвестное имя или недопустимое значение
+    """
+
+    statements = []
+    for name, value in pragmas.items():
+        if name not in SQLITE_PRAGMAS or not _VALUE_RE.match(str(value)):
+            raise ImproperlyConfigured(
+                f'Недопустимая настройка BLOG_SQLITE_PRAGMAS: '
+                f'{name}={value!r}.'
+            )
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+@receiver(connection_created, dispatch_uid='blog.apply_sqlite_pragmas')
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Применяет BLOG_SQLITE_PRAGMAS к каждому новому соединению с SQLite:
+    WAL позволяет читать во время записи, synchronous=NORMAL убирает
+    fsync на каждую транзакцию, busy_timeout заставляет писателя ждать
+    блокировку вместо ошибки «database is locked».
+    """
+
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'BLOG_SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for statement in sqlite_pragma_statements(pragmas):
+            cursor.execute(statement)
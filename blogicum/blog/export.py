@@ -0,0 +1,137 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import Comment, Post
+
+# Колонки выгрузки: имя колонки -> поле модели или путь через связи
+EXPORT_COLUMNS = {
+    'posts': {
+        'id': 'id',
+        'title': 'title',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'created_at': 'created_at',
+        'is_published': 'is_published',
+        'author': 'author__username',
+        'category': 'category__slug',
+        'location': 'location__name',
+        'comment_count': 'comment_count',
+    },
+    'comments': {
+        'id': 'id',
+        'post_id': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created_at': 'created_at',
+    },
+}
+EXPORT_FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def day_start(day):
+    """Начало суток day в текущем часовом поясе."""
+
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_queryset(kind, since=None, until=None, category=None,
+                    author=None):
+    """
+    Строит запрос строк выгрузки. Связанные объекты присоединяются
+    в том же запросе, поэтому выгрузка выполняется одним SELECT.
+    Args:
+        kind: 'posts' или 'comments'
+        since: Первый день диапазона (date) включительно
+        until: Последний день диапазона (date) включительно
+        category: slug категории
+        author: Имя пользователя автора
+    Returns:
+        QuerySet словарей с полями EXPORT_COLUMNS[kind]
+    """
+
+    if kind == 'posts':
+        queryset = Post.objects.all()
+        date_field, category_field = 'pub_date', 'category__slug'
+    else:
+        queryset = Comment.objects.all()
+        date_field, category_field = 'created_at', 'post__category__slug'
+    filters = {}
+    # Границы-моменты времени вместо __date: сравнение идет по индексу
+    if since:
+        filters[f'{date_field}__gte'] = day_start(since)
+    if until:
+        filters[f'{date_field}__lt'] = day_start(until + timedelta(days=1))
+    if category:
+        filters[category_field] = category
+    if author:
+        filters['author__username'] = author
+    return queryset.filter(**filters).order_by('pk').values(
+        *EXPORT_COLUMNS[kind].values()
+    )
+
+
+def export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(queryset, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Выдаёт строки выгрузки с колонками columns, читая результат
+    запроса пачками по chunk_size без кэширования всего QuerySet
+    в памяти.
+    """
+
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            column: export_value(row[path])
+            for column, path in columns.items()
+        }
+
+
+class Echo:
+    """Объект с методом write, возвращающий записанное (для csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def iter_jsonl(rows, columns):
+    """Строки выгрузки в формате JSON Lines: один объект на строку."""
+
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def iter_csv(rows, columns):
+    """Строки выгрузки в формате CSV с заголовком."""
+
+    writer = csv.DictWriter(Echo(), fieldnames=list(columns))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_export(kind, export_format, chunk_size=DEFAULT_CHUNK_SIZE,
+                **filters):
+    """
+    Потоково формирует выгрузку строками текста.
+    Args:
+        kind: 'posts' или 'comments'
+        export_format: Формат из EXPORT_FORMATS
+        chunk_size: Размер пачки при чтении из БД
+        filters: Фильтры export_queryset
+    """
+
+    columns = EXPORT_COLUMNS[kind]
+    rows = iter_rows(export_queryset(kind, **filters), columns, chunk_size)
+    writer = iter_jsonl if export_format == 'jsonl' else iter_csv
+    return writer(rows, columns)
@@ -0,0 +1,74 @@
+from django.db.models import F
+
+from .models import Category, FeedEntry, Post
+from .streaming import batched
+
+
+def feed_entry_values(post, category_published):
+    """Поля записи ленты для поста."""
+
+    return {
+        'category_id': post.category_id,
+        'author_id': post.author_id,
+        'pub_date': post.pub_date,
+        'post_published': post.is_published,
+        'category_published': category_published,
+        'is_visible': post.is_published and category_published,
+    }
+
+
+def sync_post_entry(post):
+    """Создаёт или обновляет запись ленты сохранённого поста."""
+
+    category_published = bool(post.category_id) and Category.objects.filter(
+        pk=post.category_id, is_published=True
+    ).exists()
+    FeedEntry.objects.update_or_create(
+        post_id=post.id,
+        defaults=feed_entry_values(post, category_published)
+    )
+
+
+def set_category_visibility(category_id, is_published):
+    """
+    Переключает видимость всех постов категории одним UPDATE.
+    Returns:
+        Число обновлённых записей
+    """
+
+    if is_published:
+        return FeedEntry.objects.filter(category_id=category_id).update(
+            category_published=True, is_visible=F('post_published')
+        )
+    return FeedEntry.objects.filter(category_id=category_id).update(
+        category_published=False, is_visible=False
+    )
+
+
+def rebuild_feed_entries(batch_size=2000):
+    """
+    Перестраивает ленту по всем постам пачками bulk_create.
+    Returns:
+        Число созданных записей
+    """
+
+    FeedEntry.objects.all().delete()
+    published = set(
+        Category.objects.filter(is_published=True).values_list(
+            'pk', flat=True
+        )
+    )
+    posts = Post.objects.only(
+        'id', 'category_id', 'author_id', 'pub_date', 'is_published'
+    ).order_by().iterator(chunk_size=batch_size)
+    created = 0
+    for batch in batched(posts, batch_size):
+        FeedEntry.objects.bulk_create(
+            FeedEntry(
+                post_id=post.id,
+                **feed_entry_values(post, post.category_id in published)
+            )
+            for post in batch
+        )
+        created += len(batch)
+    return created
@@ -1,11 +1,118 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
+from .caching import PublishedChoices
+from .export import EXPORT_COLUMNS, EXPORT_FORMATS
 from .models import Post, Comment, Category, Location
 
 User = get_user_model()
 
 
+published_categories = PublishedChoices(
+    Category, 'title', 'choices:category'
+)
+published_locations = PublishedChoices(Location, 'name', 'choices:location')
+
+
+class CachedChoiceIterator:
+    """Ленивые варианты выбора поля из кэша PublishedChoices."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from self.field.cache.pairs()
+
+    def __len__(self):
+        return (
+            len(self.field.cache.pairs())
+            + (self.field.empty_label is not None)
+        )
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(len(self))
+
+    def selected(self, values):
+        """Пустой вариант и варианты только для выбранных значений."""
+
+        choices = []
+        if self.field.empty_label is not None:
+            choices.append(('', self.field.empty_label))
+        for value in values:
+            try:
+                instance = self.field.cache.get(int(value))
+            except (TypeError, ValueError):
+                continue
+            if instance is not None:
+                choices.append((instance.pk, str(instance)))
+        return choices
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    Select, который выводит в HTML только пустой и выбранный варианты.
+    Остальные подгружает по мере ввода скрипт location_autocomplete.js
+    из url, поэтому размер страницы не зависит от числа объектов.
+    Варианты поля должны быть CachedChoiceIterator.
+    """
+
+    class Media:
+        js = ('js/location_autocomplete.js',)
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.attrs['data-autocomplete-url'] = url
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        self.choices = choices.selected(value)
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """
+    Выбор опубликованного объекта без запросов к БД: варианты
+    и проверка id берутся из кэша PublishedChoices.
+    Значение — несохраняемый экземпляр модели с id и названием,
+    которого достаточно для внешнего ключа.
+    """
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(
+            queryset=cache.model.objects.filter(is_published=True), **kwargs
+        )
+
+    def _get_choices(self):
+        return CachedChoiceIterator(self)
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.cache.model):
+            value = value.pk
+        try:
+            instance = self.cache.get(int(value))
+        except (TypeError, ValueError):
+            instance = None
+        if instance is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return instance
+
+
 class PostForm(forms.ModelForm):
     """
     Форма для создания и редактирования публикаций.
@@ -18,16 +125,17 @@ class PostForm(forms.ModelForm):
         location: Местоположение
     """
 
-    category = forms.ModelChoiceField(
-        queryset=Category.objects.filter(is_published=True),
+    category = CachedModelChoiceField(
+        published_categories,
         label='Категория',
         empty_label=None
     )
-    location = forms.ModelChoiceField(
-        queryset=Location.objects.filter(is_published=True),
+    location = CachedModelChoiceField(
+        published_locations,
         label='Местоположение',
         required=False,
-        empty_label='Не выбрано'
+        empty_label='Не выбрано',
+        widget=AutocompleteSelect(reverse_lazy('blog:location_autocomplete'))
     )
 
     class Meta:
@@ -43,6 +151,12 @@ class PostForm(forms.ModelForm):
             ),
         }
 
+    def _get_validation_exclusions(self):
+        # Категория и местоположение уже проверены по кэшу опубликованных
+        # объектов; проверка внешних ключей моделью повторила бы это
+        # запросами к БД
+        return [*super()._get_validation_exclusions(), 'category', 'location']
+
 
 class CommentForm(forms.ModelForm):
     """
@@ -92,3 +206,48 @@ class ProfileForm(forms.ModelForm):
         widgets = {
             'email': forms.EmailInput(attrs={'required': True}),
         }
+
+
+class ExportForm(forms.Form):
+    """
+    Параметры выгрузки публикаций или комментариев.
+    Fields:
+        kind: Что выгружать: посты или комментарии
+        format: Формат файла
+        since: Первый день диапазона дат
+        until: Последний день диапазона дат
+        category: slug категории
+        author: Имя пользователя автора
+    """
+
+    kind = forms.ChoiceField(
+        label='Данные',
+        choices=[(kind, kind) for kind in EXPORT_COLUMNS],
+        initial='posts'
+    )
+    format = forms.ChoiceField(
+        label='Формат',
+        choices=[(fmt, fmt) for fmt in EXPORT_FORMATS],
+        initial='jsonl'
+    )
+    since = forms.DateField(label='С даты', required=False)
+    until = forms.DateField(label='По дату', required=False)
+    category = forms.SlugField(label='Категория', required=False)
+    author = forms.CharField(label='Автор', required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        since, until = cleaned_data.get('since'), cleaned_data.get('until')
+        if since and until and since > until:
+            raise forms.ValidationError(
+                'Начало диапазона дат позже его конца.'
+            )
+        return cleaned_data
+
+    def export_filters(self):
+        """Фильтры для blog.export.export_queryset из очищенных данных."""
+
+        return {
+            name: self.cleaned_data[name]
+            for name in ('since', 'until', 'category', 'author')
+        }
@@ -0,0 +1,141 @@
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Ширины производных изображений: для ленты и для страницы поста
+DEFAULT_THUMBNAIL_WIDTHS = {'feed': 640, 'detail': 1280}
+# Форматы производных и расширения их файлов
+THUMBNAIL_FORMATS = {'webp': 'webp', 'jpeg': 'jpg'}
+THUMBNAIL_QUALITY = 80
+
+
+def thumbnail_widths():
+    return getattr(
+        settings, 'BLOG_THUMBNAIL_WIDTHS', DEFAULT_THUMBNAIL_WIDTHS
+    )
+
+
+def thumbnail_name(name, width, fmt):
+    """
+    Имя файла производного изображения рядом с оригиналом:
+    posts_images/photo.jpg -> posts_images/thumbs/photo.jpg_640w.webp
+    Расширение оригинала сохраняется в имени, иначе у photo.jpg
+    и photo.png были бы общие производные.
+    """
+
+    directory, filename = posixpath.split(name)
+    return posixpath.join(
+        directory, 'thumbs', f'{filename}_{width}w.{THUMBNAIL_FORMATS[fmt]}'
+    )
+
+
+def build_thumbnails(image_field):
+    """
+    Строит уменьшенные копии изображения в форматах WebP и JPEG
+    для каждой ширины из BLOG_THUMBNAIL_WIDTHS. Изображение
+    поворачивается по EXIF и не увеличивается сверх исходного размера:
+    ширины больше исходной заменяются исходной, чтобы имя файла
+    и дескриптор srcset совпадали с настоящей шириной копии.
+    Args:
+        image_field: Значение ImageField (FieldFile) с оригиналом
+    Returns:
+        Список построенных ширин для Post.thumbnails
+    """
+
+    storage = image_field.storage
+    with storage.open(image_field.name, 'rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original = original.convert('RGB')
+    widths = sorted({
+        min(width, original.width) for width in thumbnail_widths().values()
+    })
+    for width in widths:
+        image = original.copy()
+        image.thumbnail((width, original.height))
+        for fmt in THUMBNAIL_FORMATS:
+            buffer = BytesIO()
+            image.save(buffer, format=fmt, quality=THUMBNAIL_QUALITY)
+            name = thumbnail_name(image_field.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+    return widths
+
+
+def strip_exif(image_field):
+    """
+    Перезаписывает оригинал изображения без метаданных EXIF,
+    предварительно повернув его согласно EXIF-ориентации.
+    Изображения без EXIF не перекодируются.
+    """
+
+    storage = image_field.storage
+    with storage.open(image_field.name, 'rb') as source:
+        image = Image.open(source)
+        image_format = image.format
+        if not image.getexif() and 'exif' not in image.info:
+            return
+        image = ImageOps.exif_transpose(image)
+        image.info.pop('exif', None)
+        buffer = BytesIO()
+        options = {'quality': 95} if image_format == 'JPEG' else {}
+        image.save(buffer, format=image_format, **options)
+    storage.delete(image_field.name)
+    storage.save(image_field.name, ContentFile(buffer.getvalue()))
+
+
+def delete_thumbnails(name, storage, widths):
+    """
+    Удаляет производные изображения оригинала с именем name.
+    Args:
+        widths: Построенные ширины (Post.thumbnails)
+    """
+
+    for width in widths:
+        for fmt in THUMBNAIL_FORMATS:
+            thumbnail = thumbnail_name(name, width, fmt)
+            if storage.exists(thumbnail):
+                storage.delete(thumbnail)
+
+
+def picture_sources(image_field, variant):
+    """
+    Данные для тега <picture> с производными изображениями.
+    Args:
+        image_field: Значение ImageField с оригиналом
+        variant: 'feed' или 'detail' — какую ширину отдать в src
+    Returns:
+        Словарь с srcset для WebP и JPEG и адресом src; если
+        производные ещё не построены, src указывает на оригинал,
+        а srcset пусты
+    """
+
+    # Построенные ширины записаны в посте (Post.thumbnails), поэтому
+    # хранилище при выводе карточки не опрашивается
+    storage = image_field.storage
+    widths = sorted(getattr(image_field.instance, 'thumbnails', None) or [])
+    if not widths:
+        return {'src': image_field.url, 'webp': '', 'jpeg': ''}
+    # Для src — наибольшая копия не шире нужной (у небольших
+    # изображений копии уже настроенных ширин)
+    target = thumbnail_widths()[variant]
+    src_width = max(
+        (width for width in widths if width <= target), default=widths[0]
+    )
+    srcsets = {
+        fmt: ', '.join(
+            f'{storage.url(thumbnail_name(image_field.name, width, fmt))} '
+            f'{width}w'
+            for width in widths
+        )
+        for fmt in THUMBNAIL_FORMATS
+    }
+    return {
+        'src': storage.url(
+            thumbnail_name(image_field.name, src_width, 'jpeg')
+        ),
+        **srcsets,
+    }
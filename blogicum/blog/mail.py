@@ -0,0 +1,38 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .tasks import enqueue
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Бэкенд почты, который не отправляет письма сам, а ставит их
+    в очередь фоновых задач. Отправляет их обработчик
+    manage.py runworker бэкендом из BLOG_TASKS_EMAIL_BACKEND.
+    Вложения не поддерживаются: письмо с ними не ставится в очередь,
+    а вызывает ValueError, чтобы они не потерялись молча.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if message.attachments:
+                raise ValueError(
+                    f'QueuedEmailBackend не поддерживает вложения '
+                    f'(письмо «{message.subject}»).'
+                )
+        for message in email_messages:
+            enqueue(
+                'blog.send_email',
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email,
+                to=list(message.to),
+                cc=list(message.cc),
+                bcc=list(message.bcc),
+                reply_to=list(message.reply_to),
+                headers=dict(message.extra_headers),
+                alternatives=[
+                    list(alternative)
+                    for alternative in getattr(message, 'alternatives', [])
+                ],
+            )
+        return len(email_messages)
@@ -0,0 +1,181 @@
+import tempfile
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.models import Category, Post
+
+User = get_user_model()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Worker(threading.Thread):
+    """
+    Поток, который до истечения срока повторяет запрос клиента
+    и запоминает длительности и ошибки блокировки БД.
+    Attributes:
+        latencies: Длительности успешных запросов, секунды
+        errors: Число ответов с ошибкой или «database is locked»
+    """
+
+    def __init__(self, request, deadline):
+        super().__init__(daemon=True)
+        self.request = request
+        self.deadline = deadline
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        try:
+            while time.perf_counter() < self.deadline:
+                started = time.perf_counter()
+                try:
+                    response = self.request()
+                except OperationalError:
+                    self.errors += 1
+                    continue
+                if response.status_code >= 400:
+                    self.errors += 1
+                else:
+                    self.latencies.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест SQLite: писатели одновременно добавляют
+    комментарии через add_comment, читатели открывают страницу поста.
+    Каждый прогон идет на новой временной БД, рабочая база не
+    затрагивается. Режим off — без BLOG_SQLITE_PRAGMAS, on — с ними.
+    Использование:
+        python manage.py benchmark_sqlite [--writers 8] [--readers 8]
+            [--duration 5] [--pragmas both]
+    """
+
+    help = 'Измеряет пропускную способность SQLite при одновременной записи.'
+    requires_system_checks = []
+    requires_migrations_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument(
+            '--duration', type=float, default=5.0,
+            help='Длительность прогона, секунды.'
+        )
+        parser.add_argument(
+            '--pragmas', choices=('off', 'on', 'both'), default='both'
+        )
+
+    def handle(self, *args, **options):
+        modes = ('off', 'on') if options['pragmas'] == 'both' else (
+            options['pragmas'],
+        )
+        self.stdout.write(
+            f'{"режим":<6} {"запись/с":>9} {"чтение/с":>9} '
+            f'{"p95 записи":>11} {"p95 чтения":>11} {"ошибок":>7}'
+        )
+        for mode in modes:
+            pragmas = None if mode == 'on' else {}
+            with tempfile.TemporaryDirectory() as directory:
+                result = self.run_mode(
+                    Path(directory) / 'benchmark.sqlite3', pragmas, options
+                )
+            self.stdout.write(
+                f'{mode:<6} {result["writes"]:>9.0f} {result["reads"]:>9.0f}'
+                f' {result["write_p95"]:>9.1f}мс'
+                f' {result["read_p95"]:>9.1f}мс {result["errors"]:>7}'
+            )
+
+    def run_mode(self, path, pragmas, options):
+        """
+        Один прогон на новой БД в файле path.
+        Args:
+            path: Файл временной БД
+            pragmas: BLOG_SQLITE_PRAGMAS для прогона (None — из настроек)
+            options: Параметры команды
+        """
+
+        overrides = {'ALLOWED_HOSTS': ['testserver']}
+        if pragmas is not None:
+            overrides['BLOG_SQLITE_PRAGMAS'] = pragmas
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        old_test_name = connection.settings_dict['TEST'].get('NAME')
+        connection.settings_dict['TEST']['NAME'] = str(path)
+        with override_settings(**overrides):
+            try:
+                creation.create_test_db(verbosity=0, serialize=False)
+                post = self.create_post()
+                return self.measure(post, options)
+            finally:
+                creation.destroy_test_db(old_name, verbosity=0)
+                connection.settings_dict['TEST']['NAME'] = old_test_name
+
+    def create_post(self):
+        author = User.objects.create_user('benchmark', password='benchmark')
+        category = Category.objects.create(
+            title='Бенчмарк', slug='benchmark', description='Бенчмарк'
+        )
+        return Post.objects.create(
+            title='Бенчмарк', text='Текст', author=author,
+            category=category, pub_date=author.date_joined
+        )
+
+    def measure(self, post, options):
+        comment_url = reverse('blog:add_comment', args=[post.id])
+        detail_url = reverse('blog:post_detail', args=[post.id])
+        # Клиенты и сессии создаются до начала замера
+        writer_clients = []
+        for _ in range(options['writers']):
+            client = Client()
+            client.force_login(post.author)
+            writer_clients.append(client)
+        connection.close()
+        deadline = time.perf_counter() + options['duration']
+        writers = [
+            Worker(
+                partial(client.post, comment_url, {'text': 'Комментарий'}),
+                deadline
+            )
+            for client in writer_clients
+        ]
+        readers = [
+            Worker(partial(Client().get, detail_url), deadline)
+            for _ in range(options['readers'])
+        ]
+        workers = writers + readers
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        writes = [
+            seconds for worker in writers for seconds in worker.latencies
+        ]
+        reads = [
+            seconds for worker in readers for seconds in worker.latencies
+        ]
+        return {
+            'writes': len(writes) / elapsed,
+            'reads': len(reads) / elapsed,
+            'write_p95': percentile(writes, 0.95) * 1000,
+            'read_p95': percentile(reads, 0.95) * 1000,
+            'errors': sum(worker.errors for worker in workers),
+        }
@@ -0,0 +1,211 @@
+import time
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.base import DeserializationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.caching import bump_versions, invalidate_feed_counts
+from blog.models import Post
+from blog.signals import post_feeds, post_state
+from blog.streaming import batched, iter_json_array
+
+# Модели загружаются в порядке зависимостей внешних ключей
+LOAD_ORDER = (
+    'blog.category',
+    'blog.location',
+    settings.AUTH_USER_MODEL.lower(),
+    'blog.post',
+    'blog.comment',
+)
+
+
+@contextmanager
+def keep_fixture_timestamps(model):
+    """
+    Отключает auto_now_add и auto_now у полей модели: bulk_create
+    иначе заменил бы даты из фикстуры текущим временем.
+    """
+
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+        or getattr(field, 'auto_now', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    """
+    Потоковая загрузка больших фикстур в формате db.json.
+    В отличие от loaddata файл не читается в память целиком: он
+    разбирается по частям, а объекты вставляются через bulk_create
+    пачками. Модели загружаются отдельными проходами по файлу в порядке
+    зависимостей: категории, местоположения, пользователи, посты,
+    комментарии. Сигналы при этом не отправляются, поэтому после
+    загрузки пересчитываются счётчики комментариев, перестраиваются
+    лента и поисковый индекс и сбрасывается кэш. Объекты остальных
+    моделей (журнал админки, права, сессии) загружаются последним
+    проходом так же, как это делает loaddata: по одному через save().
+    Использование:
+        python manage.py bulk_loaddata db.json [--batch-size 1000]
+    """
+
+    help = 'Потоково загружает фикстуру блога пачками bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к JSON-фикстуре.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько объектов вставлять одним bulk_create.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1 << 16,
+            help='Сколько символов файла читать за раз.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать объекты, чей первичный ключ уже занят.'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stale_feeds = set()
+        models = [apps.get_model(label) for label in LOAD_ORDER]
+        loaded = {}
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                for label, model in zip(LOAD_ORDER, models):
+                    loaded[label] = self.load_model(label, model)
+                other = self.load_other_models()
+                self.reset_sequences(models + list(other))
+        except (OSError, ValueError, DeserializationError) as error:
+            raise CommandError(f'Не удалось загрузить фикстуру: {error}')
+
+        if loaded['blog.comment']:
+            call_command('rebuild_comment_counts', stdout=self.stdout)
+        if loaded['blog.post'] or loaded['blog.category']:
+            call_command('rebuild_feed', stdout=self.stdout)
+        if loaded['blog.post']:
+            call_command('rebuild_search_index', stdout=self.stdout)
+        if any(loaded[label] for label in (
+            settings.AUTH_USER_MODEL.lower(), 'blog.post', 'blog.comment'
+        )):
+            call_command('rebuild_user_stats', stdout=self.stdout)
+        # Сигналы не отправлялись: закэшированные счётчики и страницы
+        # сбрасываются после фиксации транзакции
+        invalidate_feed_counts(*self.stale_feeds)
+        bump_versions('global')
+        total = sum(loaded.values()) + sum(other.values())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с).'
+        ))
+
+    def iter_objects(self, label):
+        """Выдаёт словари объектов модели label из фикстуры."""
+
+        with open(self.options['fixture'], encoding='utf-8') as stream:
+            for item in iter_json_array(stream, self.options['chunk_size']):
+                if item.get('model', '').lower() == label:
+                    yield item
+
+    def load_model(self, label, model):
+        """
+        Загружает объекты одной модели отдельным проходом по файлу.
+        Returns:
+            Число вставленных объектов
+        """
+
+        count = skipped_m2m = 0
+        started = reported = time.perf_counter()
+        with keep_fixture_timestamps(model) as timestamp_fields:
+            for batch in batched(
+                self.iter_objects(label), self.options['batch_size']
+            ):
+                objects = []
+                for deserialized in serializers.deserialize(
+                    'python', batch, ignorenonexistent=True
+                ):
+                    obj = deserialized.object
+                    for field in timestamp_fields:
+                        if getattr(obj, field.attname) is None:
+                            setattr(obj, field.attname, timezone.now())
+                    skipped_m2m += any(deserialized.m2m_data.values())
+                    objects.append(obj)
+                model.objects.bulk_create(
+                    objects,
+                    ignore_conflicts=self.options['ignore_conflicts']
+                )
+                if model is Post:
+                    self.stale_feeds |= post_feeds(*map(post_state, objects))
+                count += len(objects)
+                now = time.perf_counter()
+                if now - reported >= 1:
+                    reported = now
+                    self.report(label, count, now - started)
+        self.report(label, count, time.perf_counter() - started)
+        if skipped_m2m:
+            self.stdout.write(self.style.WARNING(
+                f'{label}: связи многие-ко-многим не загружены '
+                f'у {skipped_m2m} объектов.'
+            ))
+        return count
+
+    def load_other_models(self):
+        """
+        Загружает объекты моделей не из LOAD_ORDER одним проходом по
+        файлу через save(), как loaddata: с правами, журналом админки
+        и сессиями из db.json команда заменяет loaddata полностью.
+        Returns:
+            Словарь {модель: число загруженных объектов}
+        """
+
+        loaded = {}
+        with open(self.options['fixture'], encoding='utf-8') as stream:
+            items = (
+                item for item in iter_json_array(
+                    stream, self.options['chunk_size']
+                )
+                if item.get('model', '').lower() not in LOAD_ORDER
+            )
+            for batch in batched(items, self.options['batch_size']):
+                for deserialized in serializers.deserialize(
+                    'python', batch, ignorenonexistent=True
+                ):
+                    deserialized.save()
+                    model = type(deserialized.object)
+                    loaded[model] = loaded.get(model, 0) + 1
+        for model, count in loaded.items():
+            self.stdout.write(f'{model._meta.label_lower}: {count} объектов')
+        return loaded
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(
+            f'{label}: {count} объектов, '
+            f'{count / max(elapsed, 1e-9):.0f} строк/с'
+        )
+
+    def reset_sequences(self, models):
+        """Сдвигает последовательности ключей за вставленные явные pk."""
+
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
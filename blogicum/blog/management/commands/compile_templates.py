@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.templating import compile_templates
+
+
+class Command(BaseCommand):
+    """
+    Компилирует все шаблоны проекта и сообщает об ошибках синтаксиса.
+    Подходит для проверки перед деплоем: при ошибках завершается
+    с ненулевым кодом.
+    Использование:
+        python manage.py compile_templates
+    """
+
+    help = 'Компилирует все шаблоны проекта и проверяет их синтаксис.'
+
+    def handle(self, *args, **options):
+        compiled, errors = compile_templates()
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(
+                f'Ошибки в шаблонах: {len(errors)}, '
+                f'скомпилировано без ошибок: {compiled}.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблоны скомпилированы: {compiled}.'
+        ))
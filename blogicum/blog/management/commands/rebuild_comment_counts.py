@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает сохранённые счётчики комментариев у всех постов.
+    Использование:
+        python manage.py rebuild_comment_counts
+    """
+
+    help = 'Пересчитывает счётчики комментариев у постов.'
+
+    def handle(self, *args, **options):
+        counts = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(total=Count('pk')).values(
+            'total'
+        )
+        with transaction.atomic():
+            updated = Post.objects.update(
+                comment_count=Coalesce(Subquery(counts), Value(0))
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики комментариев пересчитаны для {updated} публикаций.'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.caching import bump_versions, reset_feed_clock
+from blog.feed import rebuild_feed_entries
+
+
+class Command(BaseCommand):
+    """
+    Перестраивает материализованную ленту FeedEntry по всем постам.
+    Использование:
+        python manage.py rebuild_feed
+    """
+
+    help = 'Перестраивает материализованную ленту постов.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_feed_entries()
+        bump_versions('global')
+        reset_feed_clock()
+        self.stdout.write(self.style.SUCCESS(
+            f'Лента перестроена: {created} записей.'
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Перестраивает поисковый индекс постов выбранного бэкенда
+    (настройка BLOG_SEARCH_BACKEND).
+    Использование:
+        python manage.py rebuild_search_index
+    """
+
+    help = 'Перестраивает поисковый индекс постов.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Поисковый индекс ({backend.name}) перестроен.'
+        ))
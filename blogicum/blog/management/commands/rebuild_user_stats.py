@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает статистику всех пользователей для страниц профиля.
+    Использование:
+        python manage.py rebuild_user_stats
+    """
+
+    help = 'Пересчитывает счётчики постов и комментариев пользователей.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_user_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика пересчитана для {updated} пользователей.'
+        ))
@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from blog.tasks import claim_tasks, run_task
+
+
+def run_in_thread(queued):
+    """Выполняет задачу в потоке пула и закрывает его соединение с БД."""
+
+    try:
+        run_task(queued)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    """
+    Обработчик очереди фоновых задач (обработка изображений, почта).
+    Использование:
+        python manage.py runworker [--threads 4] [--poll 1.0] [--once]
+    """
+
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Число потоков, выполняющих задачи.'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=1.0,
+            help='Пауза в секундах, если очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                close_old_connections()
+                claimed = claim_tasks(threads)
+                for queued in claimed:
+                    self.stdout.write(f'Задача {queued.name} #{queued.pk}')
+                list(pool.map(run_in_thread, claimed))
+                if not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
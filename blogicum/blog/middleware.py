@@ -0,0 +1,144 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .routers import PRIMARY_COOKIE, SAFE_METHODS, read_replicas
+
+logger = logging.getLogger('blog.sql')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """
+    Приводит SQL к «форме» запроса: литералы и списки IN заменяются
+    на плейсхолдеры, чтобы одинаковые запросы с разными параметрами
+    совпадали.
+    """
+
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    Обёртка выполнения запросов (connection.execute_wrapper),
+    запоминающая форму и длительность каждого запроса.
+    Attributes:
+        queries: Список пар (форма запроса, длительность в секундах)
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                (normalize_sql(sql), time.perf_counter() - started)
+            )
+
+    def summary(self, threshold):
+        """
+        Сводка по запросам.
+        Args:
+            threshold: Сколько повторов одной формы запроса считать N+1
+        """
+
+        shapes = Counter(shape for shape, _ in self.queries)
+        return {
+            'count': len(self.queries),
+            'time_ms': round(
+                sum(duration for _, duration in self.queries) * 1000, 2
+            ),
+            'n_plus_one': [
+                {'sql': shape, 'count': count}
+                for shape, count in shapes.most_common()
+                if count > threshold
+            ],
+        }
+
+
+class SQLProfilerMiddleware:
+    """
+    Записывает все SQL-запросы запроса: число, общее время и
+    повторяющиеся формы. Если одна форма выполняется больше
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD раз, запрос помечается как N+1.
+    Сводка пишется в лог blog.sql и в заголовок ответа X-SQL-Profile.
+    Включается настройкой SQL_PROFILER_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(
+            settings, 'SQL_PROFILER_N_PLUS_ONE_THRESHOLD', 5
+        )
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        summary = recorder.summary(self.threshold)
+        match = request.resolver_match
+        summary.update({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+        })
+        response['X-SQL-Profile'] = (
+            f'queries={summary["count"]}; time={summary["time_ms"]}ms; '
+            f'n_plus_one={len(summary["n_plus_one"])}'
+        )
+        level = logging.WARNING if summary['n_plus_one'] else logging.DEBUG
+        logger.log(
+            level, json.dumps(summary, ensure_ascii=False),
+            extra={'sql_profile': summary}
+        )
+        return response
+
+
+class PrimaryStickinessMiddleware:
+    """
+    После успешного изменяющего запроса (создание поста, комментарий,
+    вход) ставит cookie PRIMARY_COOKIE: следующие
+    BLOG_PRIMARY_STICKY_SECONDS секунд пользователь читает из основной
+    БД и видит свою запись, даже если реплика отстает
+    (см. blog.routers.read_from_replica).
+    Без настроенных реплик ничего не делает.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400 and read_replicas()
+        ):
+            seconds = getattr(settings, 'BLOG_PRIMARY_STICKY_SECONDS', 5)
+            response.set_cookie(
+                PRIMARY_COOKIE, str(time.time() + seconds), max_age=seconds,
+                httponly=True, samesite='Lax'
+            )
+        return response
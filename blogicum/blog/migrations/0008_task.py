@@ -0,0 +1,57 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:21
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True,
+                 primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(
+                    max_length=128, verbose_name='Задача')),
+                ('payload', models.JSONField(
+                    default=dict, verbose_name='Аргументы')),
+                ('status', models.CharField(
+                    choices=[('pending', 'В очереди'),
+                             ('running', 'Выполняется'),
+                             ('done', 'Выполнена'),
+                             ('failed', 'Ошибка')],
+                    default='pending',
+                    max_length=16,
+                    verbose_name='Состояние')),
+                ('attempts', models.PositiveSmallIntegerField(
+                    default=0, verbose_name='Попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(
+                    default=3, verbose_name='Допустимо попыток')),
+                ('run_after', models.DateTimeField(
+                    default=django.utils.timezone.now,
+                    verbose_name='Выполнить после')),
+                ('last_error', models.TextField(
+                    blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(
+                    auto_now_add=True, verbose_name='Добавлено')),
+                ('updated_at', models.DateTimeField(
+                    auto_now=True, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ['run_after'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(
+                fields=['status', 'run_after'],
+                name='task_status_run_after_idx'),
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:29
+
+import re
+import sqlite3
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Код индекса скопирован из blog.search на момент миграции: изменения
+# модуля не должны менять уже примененные миграции
+FTS_TABLE = 'blog_post_fts'
+TITLE_WEIGHT = 3
+MAX_TERM_LENGTH = 64
+_WORD_RE = re.compile(r'\w+')
+
+
+def fts5_available():
+    probe = sqlite3.connect(':memory:')
+    try:
+        probe.execute('CREATE VIRTUAL TABLE probe USING fts5(text)')
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def fts5_enabled(schema_editor):
+    return schema_editor.connection.vendor == 'sqlite' and fts5_available()
+
+
+def tokenize(text):
+    return [
+        word[:MAX_TERM_LENGTH]
+        for word in _WORD_RE.findall(text.lower().replace('ё', 'е'))
+    ]
+
+
+def post_term_weights(post):
+    weights = {}
+    for field, factor in ((post.title, TITLE_WEIGHT), (post.text, 1)):
+        for term in tokenize(field):
+            weights[term] = weights.get(term, 0) + factor
+    return weights
+
+
+def create_search_index(apps, schema_editor):
+    """
+    На SQLite с FTS5 создает виртуальную таблицу blog_post_fts и
+    заполняет ее постами, на других БД заполняет PostSearchTerm.
+    """
+
+    if fts5_enabled(schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, text, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            f"SELECT id, REPLACE(REPLACE(title, 'ё', 'е'), 'Ё', 'Е'), "
+            f"REPLACE(REPLACE(text, 'ё', 'е'), 'Ё', 'Е') FROM blog_post"
+        )
+        return
+    Post = apps.get_model('blog', 'Post')
+    PostSearchTerm = apps.get_model('blog', 'PostSearchTerm')
+    for post in Post.objects.only('id', 'title', 'text').iterator():
+        PostSearchTerm.objects.bulk_create(
+            PostSearchTerm(post_id=post.id, term=term, weight=weight)
+            for term, weight in post_term_weights(post).items()
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True,
+                 primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(
+                    max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='search_terms',
+                    to='blog.post',
+                    verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'слово поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postsearchterm',
+            constraint=models.UniqueConstraint(
+                fields=('term', 'post'), name='post_search_term_unique'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
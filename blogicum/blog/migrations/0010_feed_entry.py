@@ -0,0 +1,95 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_feed_entries(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Category = apps.get_model('blog', 'Category')
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    published = set(
+        Category.objects.filter(is_published=True).values_list(
+            'pk', flat=True
+        )
+    )
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                post_id=post.id,
+                category_id=post.category_id,
+                author_id=post.author_id,
+                pub_date=post.pub_date,
+                post_published=post.is_published,
+                category_published=post.category_id in published,
+                is_visible=(
+                    post.is_published and post.category_id in published
+                ),
+            )
+            for post in Post.objects.order_by().iterator()
+        ),
+        batch_size=2000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0009_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='feed_entry',
+                    serialize=False,
+                    to='blog.post',
+                    verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(
+                    verbose_name='Дата и время публикации')),
+                ('post_published', models.BooleanField(
+                    verbose_name='Пост опубликован')),
+                ('category_published', models.BooleanField(
+                    verbose_name='Категория опубликована')),
+                ('is_visible', models.BooleanField(
+                    verbose_name='Виден в лентах')),
+                ('author', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+',
+                    to=settings.AUTH_USER_MODEL,
+                    verbose_name='Автор')),
+                ('category', models.ForeignKey(
+                    db_index=False,
+                    null=True,
+                    on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='+',
+                    to='blog.category',
+                    verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Лента',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(
+                condition=models.Q(is_visible=True),
+                fields=['pub_date', 'post'],
+                name='feed_visible_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(
+                condition=models.Q(is_visible=True),
+                fields=['category', 'pub_date', 'post'],
+                name='feed_category_pub_date_idx'),
+        ),
+        migrations.RunPython(fill_feed_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:39
+
+from django.db import migrations, models
+
+import blog.models
+
+
+def fill_name_normalized(apps, schema_editor):
+    Location = apps.get_model('blog', 'Location')
+    locations = list(Location.objects.only('id', 'name'))
+    for location in locations:
+        location.name_normalized = blog.models.normalize_name(location.name)
+    Location.objects.bulk_update(
+        locations, ['name_normalized'], batch_size=2000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='name_normalized',
+            field=blog.models.NormalizedNameField(
+                default='',
+                max_length=256,
+                source='name',
+                verbose_name='Название для поиска'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(
+                condition=models.Q(is_published=True),
+                fields=['name_normalized'],
+                name='location_name_normalized_idx'),
+        ),
+        migrations.RunPython(fill_name_normalized, migrations.RunPython.noop),
+    ]
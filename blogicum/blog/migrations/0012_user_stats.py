@@ -0,0 +1,72 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def count_subquery(queryset):
+    counts = queryset.filter(
+        author=OuterRef('user_id')
+    ).order_by().values('author').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def fill_user_stats(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    UserStats = apps.get_model('blog', 'UserStats')
+    UserStats.objects.bulk_create(
+        UserStats(user_id=user_id)
+        for user_id in User.objects.values_list('pk', flat=True).iterator()
+    )
+    UserStats.objects.update(
+        post_count=count_subquery(Post.objects.all()),
+        published_count=count_subquery(
+            Post.objects.filter(is_published=True)
+        ),
+        comment_count=count_subquery(Comment.objects.all()),
+        last_post_at=Subquery(
+            Post.objects.filter(author_id=OuterRef('user_id'))
+            .order_by('-created_at').values('created_at')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0011_location_name_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='stats',
+                    serialize=False,
+                    to=settings.AUTH_USER_MODEL,
+                    verbose_name='Пользователь')),
+                ('post_count', models.PositiveIntegerField(
+                    default=0, verbose_name='Постов')),
+                ('published_count', models.PositiveIntegerField(
+                    default=0, verbose_name='Опубликовано постов')),
+                ('comment_count', models.PositiveIntegerField(
+                    default=0, verbose_name='Комментариев')),
+                ('last_post_at', models.DateTimeField(
+                    null=True, verbose_name='Последний пост')),
+            ],
+            options={
+                'verbose_name': 'статистика пользователя',
+                'verbose_name_plural': 'Статистика пользователей',
+            },
+        ),
+        migrations.RunPython(fill_user_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:59
+
+from django.db import migrations, models
+
+
+def enqueue_thumbnails(apps, schema_editor):
+    # Имена уменьшенных копий изменились (в них вошло расширение
+    # оригинала), поэтому копии всех изображений строятся заново
+    Post = apps.get_model('blog', 'Post')
+    Task = apps.get_model('blog', 'Task')
+    Task.objects.bulk_create(
+        Task(name='blog.process_post_image', payload={'post_id': post_id})
+        for post_id in Post.objects.exclude(image='').values_list(
+            'pk', flat=True
+        ).iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_user_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails',
+            field=models.JSONField(
+                default=list,
+                editable=False,
+                verbose_name='Ширины уменьшенных копий'),
+        ),
+        migrations.RunPython(enqueue_thumbnails, migrations.RunPython.noop),
+    ]
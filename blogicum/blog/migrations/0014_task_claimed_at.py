@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:01
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_claimed_at(apps, schema_editor):
+    # Задачи, уже захваченные до миграции, получают аренду от времени
+    # последнего изменения, иначе их никогда не заберут повторно
+    Task = apps.get_model('blog', 'Task')
+    Task.objects.filter(status='running').update(claimed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='claimed_at',
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name='Захвачена'),
+        ),
+        migrations.RunPython(fill_claimed_at, migrations.RunPython.noop),
+    ]
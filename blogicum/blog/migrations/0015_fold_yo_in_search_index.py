@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:12
+
+from django.db import migrations
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def refill_search_index(apps, schema_editor):
+    # Токенизатор unicode61 не приравнивает ё к е: индекс, заполненный
+    # до этой миграции, перестраивается из текста с ё, замененной на е
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE]
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute(f'DELETE FROM {FTS_TABLE}')
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+        f"SELECT id, REPLACE(REPLACE(title, 'ё', 'е'), 'Ё', 'Е'), "
+        f"REPLACE(REPLACE(text, 'ё', 'е'), 'Ё', 'Е') FROM blog_post"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_task_claimed_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(refill_search_index, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 
 User = get_user_model()
@@ -41,16 +42,71 @@ class Category(models.Model):
         return self.title
 
 
+def normalize_name(name):
+    """Название для поиска по префиксу: регистр, ё и пробелы не важны."""
+
+    return ' '.join(name.casefold().replace('ё', 'е').split())
+
+
+class NormalizedNameField(models.CharField):
+    """
+    Нормализованная копия текстового поля source. Значение вычисляется
+    в pre_save, поэтому заполняется и при save(), и при bulk_create.
+    """
+
+    def __init__(self, *args, source='name', **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        kwargs.pop('editable', None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize_name(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class LocationQuerySet(models.QuerySet):
+    """QuerySet местоположений."""
+
+    def autocomplete(self, prefix, limit=10):
+        """
+        Опубликованные местоположения, название которых начинается
+        с prefix (без учета регистра и ё), в алфавитном порядке.
+        Префикс ищется диапазоном [prefix, prefix + U+10FFFF) по индексу
+        location_name_normalized_idx, а не через LIKE, который SQLite
+        не умеет вести по индексу без учета регистра.
+        """
+
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return self.none()
+        return self.filter(
+            is_published=True,
+            name_normalized__gte=prefix,
+            name_normalized__lt=prefix + '\U0010ffff',
+        ).order_by('name_normalized')[:limit]
+
+
 class Location(models.Model):
     """
     Модель местоположения для указания места создания поста.
     Attributes:
         name: Название места
+        name_normalized: Название для автодополнения
         is_published: Флаг публикации местоположения
         created_at: Дата создания
     """
 
     name = models.CharField('Название места', max_length=256)
+    name_normalized = NormalizedNameField(
+        'Название для поиска', max_length=256, source='name', default=''
+    )
     is_published = models.BooleanField(
         'Опубликовано',
         default=True,
@@ -58,14 +114,59 @@ class Location(models.Model):
     )
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
 
+    objects = LocationQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'местоположение'
         verbose_name_plural = 'Местоположения'
+        # Автодополнение ищет префикс диапазоном по этому индексу
+        indexes = [
+            models.Index(
+                fields=['name_normalized'],
+                name='location_name_normalized_idx',
+                condition=models.Q(is_published=True)
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    """
+    QuerySet публикаций с общими для лент условиями и подгрузками.
+    Все ленты строятся из этих методов, чтобы SQL был одинаковым
+    и настраивался в одном месте.
+    """
+
+    def published(self):
+        """
+        Оставляет посты, видимые всем: опубликованные, с наступившей
+        датой публикации и в опубликованной категории.
+        """
+
+        return self.filter(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True
+        )
+
+    def with_feed_relations(self):
+        """Подгружает автора, категорию и местоположение одним JOIN."""
+
+        return self.select_related('author', 'category', 'location')
+
+    def with_live_comment_counts(self):
+        """
+        Считает комментарии одним annotate(Count) в поле
+        live_comment_count — для сверки с сохранённым счётчиком
+        comment_count. Лентам он не нужен: comment_count уже входит
+        в выборку поста.
+        """
+
+        return self.annotate(live_comment_count=models.Count('comments'))
+
+
 class Post(models.Model):
     """
     Модель публикации (поста) в блоге.
@@ -79,6 +180,8 @@ class Post(models.Model):
         image: Изображение к посту
         is_published: Флаг публикации поста
         created_at: Дата создания
+        comment_count: Количество комментариев (поддерживается сигналами)
+        thumbnails: Ширины построенных уменьшенных копий изображения
     """
     
     title = models.CharField('Заголовок', max_length=256)
@@ -90,11 +193,14 @@ class Post(models.Model):
             'можно делать отложенные публикации.'
         )
     )
+    # Отдельные индексы внешних ключей не нужны: их покрывают составные
+    # индексы из Meta.indexes, начинающиеся с этих полей
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         verbose_name='Автор публикации',
-        related_name='posts'
+        related_name='posts',
+        db_index=False
     )
     location = models.ForeignKey(
         Location,
@@ -107,7 +213,8 @@ class Post(models.Model):
         Category,
         on_delete=models.SET_NULL,
         null=True,
-        verbose_name='Категория'
+        verbose_name='Категория',
+        db_index=False
     )
     image = models.ImageField(
         'Изображение',
@@ -120,17 +227,171 @@ class Post(models.Model):
         help_text='Снимите галочку, чтобы скрыть публикацию.'
     )
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    thumbnails = models.JSONField(
+        'Ширины уменьшенных копий',
+        default=list,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        # Индексы под условие видимости лент и сортировку по дате
+        indexes = [
+            models.Index(
+                fields=['is_published', 'pub_date'],
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=['category', 'is_published', 'pub_date'],
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    def comment_count(self):
-        return self.comments.count()
+    def is_visible(self):
+        """Проверяет для загруженного поста условие published()."""
+
+        return (
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category is not None
+            and self.category.is_published
+        )
+
+
+class FeedEntryQuerySet(models.QuerySet):
+    """QuerySet записей материализованной ленты."""
+
+    def visible(self):
+        """
+        Записи видимых всем постов: флаг is_visible учитывает публикацию
+        поста и категории, дата публикации сверяется с текущим временем.
+        """
+
+        return self.filter(is_visible=True, pub_date__lte=timezone.now())
+
+    def with_posts(self):
+        """Подгружает посты с автором, категорией и местоположением."""
+
+        return self.select_related(
+            'post__author', 'post__category', 'post__location'
+        )
+
+
+class FeedEntry(models.Model):
+    """
+    Строка денормализованной ленты: всё, что нужно для отбора
+    и сортировки поста в лентах, без JOIN с категорией.
+    Поддерживается сигналами (см. blog/feed.py).
+    Attributes:
+        post: Пост (он же первичный ключ)
+        category: Категория поста
+        author: Автор поста
+        pub_date: Дата публикации поста
+        post_published: Флаг публикации поста
+        category_published: Флаг публикации категории
+        is_visible: Пост и категория опубликованы
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry',
+        verbose_name='Публикация'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Категория',
+        db_index=False  # Покрывается индексом feed_category_pub_date_idx
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+    post_published = models.BooleanField('Пост опубликован')
+    category_published = models.BooleanField('Категория опубликована')
+    is_visible = models.BooleanField('Виден в лентах')
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Лента'
+        # Частичные индексы по видимым записям: отбор и сортировка лент
+        # читаются из них, а условие is_visible в SQLite записывается
+        # без сравнения и ключом индекса служить не может
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'post'],
+                condition=models.Q(is_visible=True),
+                name='feed_visible_pub_date_idx'
+            ),
+            models.Index(
+                fields=['category', 'pub_date', 'post'],
+                condition=models.Q(is_visible=True),
+                name='feed_category_pub_date_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Лента: {self.post_id}'
+
+
+class UserStats(models.Model):
+    """
+    Счётчики пользователя для страницы профиля. Обновляются сигналами
+    одним UPDATE на изменение (см. blog/stats.py) и загружаются вместе
+    с пользователем, поэтому профиль не выполняет COUNT по постам.
+    Attributes:
+        user: Пользователь (он же первичный ключ)
+        post_count: Всего постов, включая снятые с публикации
+        published_count: Постов с флагом публикации
+        comment_count: Комментариев пользователя
+        last_post_at: Когда создан последний пост
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    post_count = models.PositiveIntegerField('Постов', default=0)
+    published_count = models.PositiveIntegerField(
+        'Опубликовано постов', default=0
+    )
+    comment_count = models.PositiveIntegerField('Комментариев', default=0)
+    last_post_at = models.DateTimeField('Последний пост', null=True)
+
+    class Meta:
+        verbose_name = 'статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return f'Статистика: {self.user_id}'
 
 
 class Comment(models.Model):
@@ -148,7 +409,8 @@ class Comment(models.Model):
         Post,
         on_delete=models.CASCADE,
         related_name='comments',
-        verbose_name='Публикация'
+        verbose_name='Публикация',
+        db_index=False  # Покрывается индексом comment_post_created_idx
     )
     author = models.ForeignKey(
         User,
@@ -162,6 +424,103 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['created_at']  # Сортировка от старых к новым
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий {self.author} к посту "{self.post.title}"'
+
+
+class PostSearchTerm(models.Model):
+    """
+    Запись инвертированного индекса для поиска без FTS5 (см. blog/search.py).
+    Attributes:
+        term: Слово в нормализованной форме
+        post: Пост, в котором встречается слово
+        weight: Число вхождений; вхождения в заголовок весят больше
+    """
+
+    term = models.CharField('Слово', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Публикация'
+    )
+    weight = models.PositiveIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'post'], name='post_search_term_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.term} → {self.post_id}'
+
+
+class Task(models.Model):
+    """
+    Фоновая задача в очереди на базе БД (см. blog/tasks.py).
+    Attributes:
+        name: Имя зарегистрированной задачи
+        payload: Именованные аргументы задачи
+        status: Состояние задачи
+        attempts: Число выполненных попыток
+        max_attempts: Допустимое число попыток
+        run_after: Время, не раньше которого задачу можно выполнять
+        claimed_at: Время захвата обработчиком (начало аренды)
+        last_error: Текст последней ошибки
+        created_at: Дата создания
+        updated_at: Дата последнего изменения
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=128)
+    payload = models.JSONField('Аргументы', default=dict)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Допустимо попыток', default=3
+    )
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    claimed_at = models.DateTimeField('Захвачена', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ['run_after']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'],
+                name='task_status_run_after_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
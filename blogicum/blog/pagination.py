@@ -0,0 +1,202 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import get_feed_count
+
+
+class FeedPage(Page):
+    """
+    Страница ленты с окном номеров страниц для шаблона.
+    Attributes:
+        page_window: Номера страниц вокруг текущей и по краям,
+            пропуски обозначены Paginator.ELLIPSIS
+    """
+
+    @property
+    def page_window(self):
+        return self.paginator.get_elided_page_range(
+            self.number, on_each_side=2, on_ends=1
+        )
+
+
+class FeedPaginator(Paginator):
+    """
+    Пагинатор ленты с кэшируемым общим числом объектов.
+    Если задано имя ленты, COUNT выполняется только при промахе кэша;
+    сбрасывается счётчик сигналами сохранения и удаления постов.
+    Attributes:
+        feed: Имя ленты для ключа кэша (None — без кэширования)
+        known_count: Заранее известное число объектов (None — считать)
+    """
+
+    def __init__(self, object_list, per_page, feed=None, count=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+        self.known_count = count
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        if self.feed is None:
+            return super().count
+        return get_feed_count(self.feed, self._count_objects)
+
+    def _count_objects(self):
+        return super().count
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class KeysetPage:
+    """
+    Страница keyset-пагинации.
+    Не знает общего числа объектов и номера страницы — только то,
+    есть ли следующая страница и с какого курсора она начинается.
+    Attributes:
+        object_list: Объекты текущей страницы
+        next_cursor: Курсор для параметра ?after= следующей страницы
+        cursor: Курсор, с которого построена текущая страница
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor, cursor, paginator):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+        self.paginator = paginator
+
+    def __repr__(self):
+        return f'<KeysetPage after {self.cursor!r}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по ключу (keyset/cursor) вместо OFFSET.
+    Следующая страница выбирается условием «строго после последней
+    записи» по уникальному набору полей, поэтому не нужен COUNT(*),
+    а время ответа не растёт с номером страницы.
+    Attributes:
+        queryset: QuerySet с объектами для пагинации
+        per_page: Количество объектов на странице
+        keys: Поля сортировки; последнее должно быть уникальным
+        descending: Сортировать ли по убыванию
+    """
+
+    def __init__(self, queryset, per_page, keys=('pub_date', 'id'),
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = tuple(keys)
+        self.descending = descending
+
+    def encode_cursor(self, obj):
+        """Кодирует значения ключевых полей объекта в непрозрачный курсор."""
+
+        # isoformat() вместо DjangoJSONEncoder: тот обрезает микросекунды,
+        # а курсору нужно точное значение
+        values = [
+            value.isoformat() if isinstance(value, datetime.datetime)
+            else value
+            for value in (getattr(obj, key) for key in self.keys)
+        ]
+        raw = json.dumps(values).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        Декодирует курсор в значения ключевых полей.
+        Returns:
+            Список значений или None, если курсор повреждён
+        """
+
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            return None
+        try:
+            return [
+                self._key_value(key, value)
+                for key, value in zip(self.keys, values)
+            ]
+        except ValidationError:
+            return None
+
+    def _key_value(self, key, value):
+        """
+        Приводит значение из курсора к типу поля модели. Ключи-аннотации
+        (например, ранг поиска) хранятся в курсоре как числа JSON.
+        """
+
+        try:
+            field = self.queryset.model._meta.get_field(key)
+        except FieldDoesNotExist:
+            if not isinstance(value, (int, float)):
+                raise ValidationError('Неверное значение курсора.')
+            return value
+        return field.to_python(value)
+
+    def _after(self, values):
+        """Строит условие «строго после» для набора значений ключа."""
+
+        lookup = 'lt' if self.descending else 'gt'
+        condition = Q()
+        equal = {}
+        for key, value in zip(self.keys, values):
+            condition |= Q(**equal, **{f'{key}__{lookup}': value})
+            equal[key] = value
+        return condition
+
+    def get_page(self, cursor=None):
+        """
+        Возвращает страницу, начинающуюся после курсора.
+        Повреждённый курсор трактуется как первая страница,
+        по аналогии с Paginator.get_page().
+        """
+
+        prefix = '-' if self.descending else ''
+        queryset = self.queryset.order_by(
+            *(f'{prefix}{key}' for key in self.keys)
+        )
+        values = self.decode_cursor(cursor) if cursor else None
+        if values is None:
+            cursor = None
+        else:
+            queryset = queryset.filter(self._after(values))
+        objects = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(objects) > self.per_page:
+            objects = objects[:self.per_page]
+            next_cursor = self.encode_cursor(objects[-1])
+        return KeysetPage(objects, next_cursor, cursor, self)
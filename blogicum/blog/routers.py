@@ -0,0 +1,95 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Cookie, в котором хранится момент (Unix time), до которого
+# пользователь читает из основной БД после своей записи
+PRIMARY_COOKIE = 'blog_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Псевдоним БД для чтения в текущем запросе; None — основная БД
+_read_database = ContextVar('blog_read_database', default=None)
+
+
+def read_replicas():
+    return list(getattr(settings, 'BLOG_READ_REPLICAS', []))
+
+
+def reading_from_replica():
+    """Идет ли чтение в текущем запросе с реплики."""
+
+    return _read_database.get() is not None
+
+
+def sticky_to_primary(request):
+    """Писал ли пользователь недавно (см. PrimaryStickinessMiddleware)."""
+
+    try:
+        return float(request.COOKIES.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def choose_read_database(request):
+    """
+    Реплика для чтения в запросе или None, если читать нужно из
+    основной БД: реплики не настроены, запрос изменяет данные или
+    пользователь только что писал и реплика может отставать.
+    """
+
+    replicas = read_replicas()
+    if (
+        not replicas or request.method not in SAFE_METHODS
+        or sticky_to_primary(request)
+    ):
+        return None
+    return random.choice(replicas)
+
+
+def read_from_replica(view):
+    """
+    Декоратор view: запросы на чтение внутри безопасного (GET, HEAD)
+    запроса уходят на случайную реплику из BLOG_READ_REPLICAS.
+    Запись всегда идет в основную БД (см. ReplicaRouter).
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _read_database.set(choose_read_database(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_database.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Роутер БД: чтение в view с декоратором read_from_replica идет
+    на реплику, остальное чтение и вся запись — в основную БД.
+    Реплики — копии основной БД, поэтому связи между объектами из них
+    допустимы. Локально реплику заменяет копия файла SQLite:
+        sqlite3 db.sqlite3 ".backup replica.sqlite3"
+        BLOGICUM_DB_REPLICAS=replica.sqlite3 python manage.py runserver
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        # Без этого объект, прочитанный с реплики, сохранился бы в нее
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in read_replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *read_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
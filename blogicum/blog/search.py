@@ -0,0 +1,304 @@
+import math
+import re
+import sqlite3
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, connections, router
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .caching import get_feed_count
+from .models import Post, PostSearchTerm
+from .pagination import KeysetPage, KeysetPaginator
+
+FTS_TABLE = 'blog_post_fts'
+# Как FTS5 разбивает текст на слова; fallback повторяет это правилом \w+
+FTS_TOKENIZER = 'unicode61 remove_diacritics 2'
+# Во сколько раз слово заголовка весомее слова текста
+TITLE_WEIGHT = 3
+SNIPPET_WORDS = 16
+# Символы из области частного использования Unicode отмечают найденные
+# слова в сниппете до экранирования HTML
+MARK_START, MARK_END = '\ue000', '\ue001'
+MAX_TERM_LENGTH = 64
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def fold_yo(text):
+    """
+    Заменяет ё на е. Токенизатор unicode61 FTS5 не считает ё
+    диакритикой, поэтому в индекс попадает уже приведенный текст.
+    """
+
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def fold_yo_sql(column):
+    """SQL-выражение fold_yo() для колонки column."""
+
+    return f"REPLACE(REPLACE({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре, ё приравнивается к е."""
+
+    return [
+        word[:MAX_TERM_LENGTH]
+        for word in _WORD_RE.findall(fold_yo(text.lower()))
+    ]
+
+
+def highlight(marked):
+    """Экранирует сниппет и заменяет метки найденных слов на <mark>."""
+
+    return mark_safe(
+        escape(marked)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    """Поддерживает ли библиотека SQLite модуль FTS5."""
+
+    probe = sqlite3.connect(':memory:')
+    try:
+        probe.execute('CREATE VIRTUAL TABLE probe USING fts5(text)')
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def search_cursor_paginator(per_page, descending):
+    """Пагинатор для кодирования курсоров (search_rank, id) выдачи."""
+
+    return KeysetPaginator(
+        Post.objects.none(), per_page, keys=('search_rank', 'id'),
+        descending=descending
+    )
+
+
+class FTS5SearchBackend:
+    """
+    Поиск через виртуальную таблицу SQLite FTS5 blog_post_fts
+    (rowid = id поста). Ранжирование — bm25 с повышенным весом
+    заголовка. В таблице хранится текст с ё, замененной на е, поэтому
+    сниппеты строятся по исходному тексту поста (text_snippet).
+    """
+
+    name = 'fts5'
+
+    def index_post(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.id]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                f'VALUES (%s, %s, %s)',
+                [post.id, fold_yo(post.title), fold_yo(post.text)]
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                f'SELECT id, {fold_yo_sql("title")}, {fold_yo_sql("text")} '
+                f'FROM {Post._meta.db_table}'
+            )
+
+    def search(self, terms, cursor, per_page):
+        # Каждое слово берется в кавычки: синтаксис запросов FTS5
+        # (OR, NEAR, *) из пользовательского ввода не интерпретируется
+        match = ' '.join(f'"{term}"' for term in terms)
+        paginator = search_cursor_paginator(per_page, descending=False)
+        after = paginator.decode_cursor(cursor) if cursor else None
+        params = [float(TITLE_WEIGHT), match, timezone.now()]
+        keyset = ''
+        if after is not None:
+            keyset = 'AND (m.rank > %s OR (m.rank = %s AND m.id > %s))'
+            params += [after[0], after[0], after[1]]
+        else:
+            cursor = None
+        params.append(per_page + 1)
+        # Сырой SQL идет в ту же БД, что и ORM (реплика в read_from_replica)
+        with connections[router.db_for_read(Post)].cursor() as db_cursor:
+            db_cursor.execute(
+                f'''
+                SELECT m.id, m.rank FROM (
+                    SELECT rowid AS id,
+                           bm25({FTS_TABLE}, %s, 1.0) AS rank
+                    FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s
+                ) AS m
+                JOIN {Post._meta.db_table} AS p ON p.id = m.id
+                JOIN blog_category AS c ON c.id = p.category_id
+                WHERE p.is_published AND p.pub_date <= %s
+                    AND c.is_published {keyset}
+                ORDER BY m.rank, m.id
+                LIMIT %s
+                ''',
+                params
+            )
+            rows = db_cursor.fetchall()
+        return build_page(rows, terms, cursor, paginator)
+
+
+class TermSearchBackend:
+    """
+    Переносимый поиск по инвертированному индексу в таблице
+    PostSearchTerm: для каждого слова хранится вес в каждом посте.
+    Ранг — сумма весов слов запроса, умноженных на их IDF.
+    """
+
+    name = 'python'
+
+    def post_terms(self, post):
+        weights = {}
+        for field, factor in ((post.title, TITLE_WEIGHT), (post.text, 1)):
+            for term in tokenize(field):
+                weights[term] = weights.get(term, 0) + factor
+        return [
+            PostSearchTerm(post_id=post.id, term=term, weight=weight)
+            for term, weight in weights.items()
+        ]
+
+    def index_post(self, post):
+        PostSearchTerm.objects.filter(post_id=post.id).delete()
+        PostSearchTerm.objects.bulk_create(self.post_terms(post))
+
+    def remove_post(self, post_id):
+        PostSearchTerm.objects.filter(post_id=post_id).delete()
+
+    def rebuild(self):
+        PostSearchTerm.objects.all().delete()
+        for post in Post.objects.only('id', 'title', 'text').iterator():
+            PostSearchTerm.objects.bulk_create(self.post_terms(post))
+
+    def search(self, terms, cursor, per_page):
+        terms = sorted(set(terms))
+        # Число всех постов для IDF берется из кэша счётчиков лент
+        # (сбрасывается сигналами при создании и удалении поста)
+        total = get_feed_count('all', Post.objects.count) or 1
+        frequencies = dict(
+            PostSearchTerm.objects.filter(term__in=terms)
+            .values('term').annotate(posts=Count('post_id'))
+            .values_list('term', 'posts')
+        )
+        if len(frequencies) < len(terms):
+            return KeysetPage([], None, None, None)
+        idf = {
+            term: math.log(1 + total / frequencies[term]) for term in terms
+        }
+        score = Sum(Case(
+            *(
+                When(search_terms__term=term,
+                     then=F('search_terms__weight') * Value(idf[term]))
+                for term in terms
+            ),
+            output_field=FloatField()
+        ))
+        queryset = Post.objects.published().filter(
+            search_terms__term__in=terms
+        ).annotate(
+            search_rank=score,
+            matched=Count('search_terms')
+        ).filter(matched=len(terms)).with_feed_relations()
+        paginator = KeysetPaginator(
+            queryset, per_page, keys=('search_rank', 'id'), descending=True
+        )
+        page = paginator.get_page(cursor)
+        for post in page:
+            post.search_snippet = text_snippet(post.text, terms)
+        return page
+
+
+def text_snippet(text, terms):
+    """
+    Фрагмент текста из SNIPPET_WORDS слов вокруг первого найденного
+    слова запроса с подсветкой совпадений.
+    """
+
+    words = text.split()
+    terms = set(terms)
+    found = [
+        index for index, word in enumerate(words)
+        if set(tokenize(word)) & terms
+    ]
+    start = max(0, (found[0] if found else 0) - SNIPPET_WORDS // 4)
+    window = words[start:start + SNIPPET_WORDS]
+    marked = ' '.join(
+        f'{MARK_START}{word}{MARK_END}'
+        if set(tokenize(word)) & terms else word
+        for word in window
+    )
+    if start > 0:
+        marked = '…' + marked
+    if start + SNIPPET_WORDS < len(words):
+        marked += '…'
+    return highlight(marked)
+
+
+def build_page(rows, terms, cursor, paginator):
+    """Страница выдачи FTS5 из строк (id, rank) с постами."""
+
+    has_next = len(rows) > paginator.per_page
+    rows = rows[:paginator.per_page]
+    posts = Post.objects.with_feed_relations().in_bulk(
+        [row[0] for row in rows]
+    )
+    object_list = []
+    for post_id, rank in rows:
+        post = posts[post_id]
+        post.search_rank = rank
+        post.search_snippet = text_snippet(post.text, terms)
+        object_list.append(post)
+    next_cursor = None
+    if has_next:
+        next_cursor = paginator.encode_cursor(object_list[-1])
+    return KeysetPage(object_list, next_cursor, cursor, paginator)
+
+
+def get_search_backend():
+    """
+    Возвращает бэкенд из настройки BLOG_SEARCH_BACKEND: 'fts5',
+    'python' или 'auto' (FTS5 на SQLite с его поддержкой).
+    """
+
+    name = getattr(settings, 'BLOG_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'fts5' if (
+            connection.vendor == 'sqlite' and fts5_available()
+        ) else 'python'
+    return FTS5SearchBackend() if name == 'fts5' else TermSearchBackend()
+
+
+def search_posts(query, cursor=None, per_page=10):
+    """
+    Ищет опубликованные посты (те же условия, что и у главной) по всем
+    словам запроса в заголовке и тексте.
+    Args:
+        query: Строка запроса пользователя
+        cursor: Курсор ?after= следующей страницы выдачи
+        per_page: Сколько постов на странице
+    Returns:
+        KeysetPage с постами; у каждого есть search_snippet
+    """
+
+    terms = tokenize(query)
+    if not terms:
+        return KeysetPage([], None, None, None)
+    return get_search_backend().search(terms, cursor, per_page)
@@ -0,0 +1,332 @@
+from contextvars import ContextVar
+
+from django.db.models import F
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_versions, invalidate_feed_counts, reset_feed_clock
+from .feed import set_category_visibility, sync_post_entry
+from .images import delete_thumbnails
+from .models import Category, Comment, Location, Post, UserStats
+from .search import get_search_backend
+from .stats import (
+    change_user_stats, post_comments_deleted, post_created, refresh_last_post
+)
+from .tasks import enqueue
+
+User = get_user_model()
+
+# ID постов, которые удаляются в текущем потоке вместе с комментариями
+_deleting_posts = ContextVar('blog_deleting_posts', default=frozenset())
+
+
+def change_comment_count(post_id, delta):
+    """
+    Изменяет сохранённый счётчик комментариев поста одним UPDATE.
+    Выполняется в той же транзакции, что и сохранение комментария.
+    Args:
+        post_id: ID поста
+        delta: На сколько изменить счётчик (+1 или -1)
+    """
+
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def page_versions(post_id, category_ids):
+    """
+    Имена версий закэшированных страниц, на которых виден пост:
+    главная, страницы его категорий и страница самого поста.
+    """
+
+    slugs = Category.objects.filter(
+        id__in=[pk for pk in category_ids if pk is not None]
+    ).values_list('slug', flat=True)
+    return (
+        'feed:index',
+        f'detail:{post_id}',
+        *(f'feed:category:{slug}' for slug in slugs),
+    )
+
+
+def bump_comment_pages(comment):
+    """Сбрасывает страницы, на которых выводится комментарий или их число."""
+
+    category_id = Post.objects.filter(
+        pk=comment.post_id
+    ).values_list('category_id', flat=True).first()
+    bump_versions(*page_versions(comment.post_id, [category_id]))
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    """
+    Увеличивает счётчики комментариев поста и его автора при создании
+    комментария.
+    """
+
+    if created:
+        change_comment_count(instance.post_id, 1)
+        change_user_stats(instance.author_id, comments=1)
+    bump_comment_pages(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Уменьшает счётчики комментариев поста и автора при удалении
+    комментария. Срабатывает и при удалении из админки, в том числе
+    массовом.
+    """
+
+    # Счётчики и страницы удаляемого поста обновляют его обработчики
+    if instance.post_id in _deleting_posts.get():
+        return
+    change_comment_count(instance.post_id, -1)
+    change_user_stats(instance.author_id, comments=-1)
+    bump_comment_pages(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def post_delete_started(sender, instance, **kwargs):
+    """
+    Обновляет счётчики авторов комментариев удаляемого поста одним
+    запросом и отключает обработку каждого каскадно удаляемого
+    комментария (см. comment_deleted).
+    """
+
+    post_comments_deleted(instance.id)
+    _deleting_posts.set(_deleting_posts.get() | {instance.id})
+
+
+@receiver(post_delete, sender=Post)
+def post_delete_finished(sender, instance, **kwargs):
+    """Возвращает обработку комментариев после удаления поста."""
+
+    _deleting_posts.set(_deleting_posts.get() - {instance.id})
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, **kwargs):
+    """
+    Запоминает сохранённые в БД категорию, автора, флаг публикации,
+    изображение с его копиями и дату публикации поста, чтобы
+    обработчики post_save видели, что изменилось.
+    """
+
+    instance._previous_state = None
+    if instance.pk is not None:
+        instance._previous_state = Post.objects.filter(
+            pk=instance.pk
+        ).values(
+            'category_id', 'author_id', 'is_published', 'image', 'pub_date',
+            'thumbnails'
+        ).first()
+
+
+def post_feeds(*states):
+    """Возвращает имена лент, в которые попадают посты с таким состоянием."""
+
+    feeds = {'index', 'all'}
+    for state in states:
+        if state is None:
+            continue
+        feeds.add(f'category:{state["category_id"]}')
+        feeds.add(f'author:{state["author_id"]}')
+        feeds.add(f'author:{state["author_id"]}:all')
+    return feeds
+
+
+def post_state(post):
+    return {
+        'category_id': post.category_id,
+        'author_id': post.author_id,
+        'is_published': post.is_published,
+    }
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    """Сбрасывает счётчики лент, кэш карточки и страниц с этим постом."""
+
+    previous = getattr(instance, '_previous_state', None)
+    invalidate_feed_counts(*post_feeds(post_state(instance), previous))
+    reset_feed_clock()
+    category_ids = [instance.category_id]
+    if previous is not None:
+        category_ids.append(previous['category_id'])
+    bump_versions(
+        f'post:{instance.id}', *page_versions(instance.id, category_ids)
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """Сбрасывает счётчики лент, карточки постов категории и страницы."""
+
+    # Видимость постов в профилях авторов тоже зависит от категории
+    author_ids = Post.objects.filter(
+        category_id=instance.id
+    ).values_list('author_id', flat=True).distinct()
+    invalidate_feed_counts(
+        'index', f'category:{instance.id}',
+        *(f'author:{author_id}' for author_id in author_ids)
+    )
+    reset_feed_clock()
+    bump_versions(f'category:{instance.id}', 'global', 'choices:category')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    """Сбрасывает карточки постов с этим местоположением и страницы."""
+
+    bump_versions(f'location:{instance.id}', 'global', 'choices:location')
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Сбрасывает карточки постов автора (в них выводится имя пользователя).
+    Новый пользователь и обновление только last_login при входе
+    карточки не затрагивают.
+    """
+
+    if created or (
+        update_fields is not None and set(update_fields) == {'last_login'}
+    ):
+        return
+    bump_versions(f'user:{instance.id}', 'global')
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, raw=False, **kwargs):
+    """
+    Ставит в очередь обработку нового изображения поста (удаление EXIF
+    и построение уменьшенных копий) и удаляет копии заменённого.
+    """
+
+    previous = getattr(instance, '_previous_state', None)
+    previous_image = previous['image'] if previous else ''
+    if raw or instance.image.name == previous_image:
+        return
+    if previous_image:
+        delete_thumbnails(
+            previous_image, instance.image.storage, previous['thumbnails']
+        )
+    if instance.thumbnails:
+        instance.thumbnails = []
+        Post.objects.filter(pk=instance.pk).update(thumbnails=[])
+    if instance.image:
+        enqueue('blog.process_post_image', post_id=instance.id)
+
+
+@receiver(post_delete, sender=Post)
+def post_image_deleted(sender, instance, **kwargs):
+    """Удаляет уменьшенные копии изображения удалённого поста."""
+
+    if instance.image:
+        delete_thumbnails(
+            instance.image.name, instance.image.storage, instance.thumbnails
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_search_indexed(sender, instance, **kwargs):
+    """Обновляет запись поста в поисковом индексе."""
+
+    get_search_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_search_removed(sender, instance, **kwargs):
+    """Удаляет пост из поискового индекса."""
+
+    get_search_backend().remove_post(instance.id)
+
+
+@receiver(post_save, sender=Post)
+def post_feed_entry_saved(sender, instance, **kwargs):
+    """Обновляет запись поста в материализованной ленте."""
+
+    sync_post_entry(instance)
+
+
+@receiver(post_save, sender=Category)
+def category_feed_entries_saved(sender, instance, **kwargs):
+    """Переносит флаг публикации категории в записи ленты ее постов."""
+
+    set_category_visibility(instance.id, instance.is_published)
+
+
+@receiver(pre_delete, sender=Category)
+def category_feed_entries_deleted(sender, instance, **kwargs):
+    """
+    Скрывает посты удаляемой категории: после удаления у записей ленты
+    останется пустая категория, и найти их по ней будет нельзя.
+    """
+
+    set_category_visibility(instance.id, False)
+
+
+@receiver(post_save, sender=Post)
+def post_publication_scheduled(sender, instance, **kwargs):
+    """
+    Планирует событие публикации отложенного поста на его pub_date
+    (задача blog.publish_post), если дата или флаг публикации
+    изменились.
+    """
+
+    if not instance.is_published or instance.pub_date <= timezone.now():
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if previous is not None and previous['is_published'] and (
+        previous['pub_date'] == instance.pub_date
+    ):
+        return
+    enqueue(
+        'blog.publish_post', run_after=instance.pub_date, post_id=instance.id
+    )
+
+
+@receiver(post_save, sender=User)
+def user_stats_created(sender, instance, created, **kwargs):
+    """Создаёт пустую статистику нового пользователя."""
+
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def post_user_stats_saved(sender, instance, created, **kwargs):
+    """Обновляет счётчики постов автора (и прежнего автора)."""
+
+    if created:
+        post_created(instance)
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None:
+        return
+    published = int(instance.is_published)
+    was_published = int(previous['is_published'])
+    if previous['author_id'] != instance.author_id:
+        change_user_stats(previous['author_id'], -1, -was_published)
+        change_user_stats(instance.author_id, 1, published)
+        refresh_last_post(previous['author_id'], instance.author_id)
+    elif published != was_published:
+        change_user_stats(instance.author_id, 0, published - was_published)
+
+
+@receiver(post_delete, sender=Post)
+def post_user_stats_deleted(sender, instance, **kwargs):
+    """Уменьшает счётчики постов автора удалённого поста."""
+
+    change_user_stats(instance.author_id, -1, -int(instance.is_published))
+    refresh_last_post(instance.author_id)
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Post, UserStats
+
+User = get_user_model()
+
+
+def get_user_stats(user):
+    """
+    Статистика пользователя, загруженная через select_related('stats'),
+    или None, если запись еще не создана (см. rebuild_user_stats).
+    """
+
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return None
+
+
+def change_user_stats(user_id, posts=0, published=0, comments=0):
+    """
+    Изменяет счётчики пользователя одним UPDATE.
+    Args:
+        user_id: ID пользователя
+        posts: На сколько изменить число постов
+        published: На сколько изменить число опубликованных постов
+        comments: На сколько изменить число комментариев
+    """
+
+    deltas = {
+        field: F(field) + delta for field, delta in (
+            ('post_count', posts),
+            ('published_count', published),
+            ('comment_count', comments),
+        ) if delta
+    }
+    if deltas:
+        UserStats.objects.filter(user_id=user_id).update(**deltas)
+
+
+def post_created(post):
+    """Учитывает новый пост в счётчиках и времени последнего поста."""
+
+    UserStats.objects.filter(user_id=post.author_id).update(
+        post_count=F('post_count') + 1,
+        published_count=F('published_count') + int(post.is_published),
+        # Greatest в SQLite возвращает NULL, если хоть один аргумент NULL
+        last_post_at=Greatest(
+            Coalesce(F('last_post_at'), Value(post.created_at)),
+            Value(post.created_at)
+        )
+    )
+
+
+def last_post_subquery():
+    return Subquery(
+        Post.objects.filter(author_id=OuterRef('user_id'))
+        .order_by('-created_at').values('created_at')[:1]
+    )
+
+
+def refresh_last_post(*user_ids):
+    """
+    Пересчитывает время последнего поста после удаления поста или
+    смены автора: только здесь нужен запрос к постам пользователя.
+    """
+
+    UserStats.objects.filter(user_id__in=user_ids).update(
+        last_post_at=last_post_subquery()
+    )
+
+
+def count_subquery(queryset, field):
+    counts = queryset.filter(
+        **{field: OuterRef('user_id')}
+    ).order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def post_comments_deleted(post_id):
+    """
+    Вычитает комментарии удаляемого поста из счётчиков их авторов одним
+    UPDATE вместо UPDATE на каждый комментарий.
+    """
+
+    comments = Comment.objects.filter(post_id=post_id)
+    UserStats.objects.filter(
+        user_id__in=comments.values('author_id')
+    ).update(
+        comment_count=F('comment_count') - count_subquery(comments, 'author')
+    )
+
+
+def rebuild_user_stats():
+    """
+    Создаёт недостающие записи статистики и пересчитывает счётчики
+    всех пользователей одним UPDATE.
+    Returns:
+        Число обновлённых записей
+    """
+
+    UserStats.objects.bulk_create(
+        UserStats(user_id=user_id) for user_id in User.objects.filter(
+            stats__isnull=True
+        ).values_list('pk', flat=True).iterator()
+    )
+    return UserStats.objects.update(
+        post_count=count_subquery(Post.objects.all(), 'author'),
+        published_count=count_subquery(
+            Post.objects.filter(is_published=True), 'author'
+        ),
+        comment_count=count_subquery(Comment.objects.all(), 'author'),
+        last_post_at=last_post_subquery()
+    )
@@ -0,0 +1,104 @@
+import json
+from itertools import islice
+
+JSON_WHITESPACE = ' \t\n\r'
+# Символы, которыми может завершаться элемент массива
+JSON_VALUE_END = JSON_WHITESPACE + ',]'
+
+
+class JSONArrayReader:
+    """
+    Буфер над текстовым потоком для разбора JSON-массива по частям.
+    В памяти держится только непрочитанный хвост буфера.
+    """
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        """Дочитывает следующую часть потока, отбрасывая разобранное."""
+
+        chunk = self.stream.read(self.chunk_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+
+    def peek(self, separators=JSON_WHITESPACE):
+        """
+        Пропускает символы separators и возвращает следующий символ
+        или пустую строку в конце потока.
+        """
+
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in separators
+            ):
+                self.position += 1
+            if self.position < len(self.buffer) or self.eof:
+                return self.buffer[self.position:self.position + 1]
+            self.fill()
+
+    def decode(self):
+        """Разбирает значение с текущей позиции, дочитывая поток."""
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            # Число у края буфера может быть обрезано: «12» из «125»
+            # или «3» из «3.5», поэтому за значением нужен разделитель
+            if self.eof or (
+                end < len(self.buffer) and self.buffer[end] in JSON_VALUE_END
+            ):
+                self.position = end
+                return value
+            self.fill()
+
+
+def iter_json_array(stream, chunk_size=1 << 16):
+    """
+    Разбирает JSON-массив верхнего уровня по частям и выдаёт его
+    элементы по одному, поэтому размер файла не важен.
+    Args:
+        stream: Текстовый файловый объект с JSON-массивом
+        chunk_size: Сколько символов читать за раз
+    Raises:
+        ValueError: Если в потоке не JSON-массив или он оборван
+    """
+
+    reader = JSONArrayReader(stream, chunk_size)
+    if reader.peek() != '[':
+        raise ValueError('Ожидался JSON-массив.')
+    reader.position += 1
+    separators = JSON_WHITESPACE
+    while True:
+        char = reader.peek(separators)
+        if not char:
+            raise ValueError('JSON-массив оборван.')
+        if char == ']':
+            return
+        yield reader.decode()
+        separators = JSON_WHITESPACE + ','
+
+
+def batched(iterable, size):
+    """Разбивает итерируемый объект на списки не длиннее size."""
+
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,233 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .caching import (
+    bump_versions, feed_valid_until, get_feed_count, invalidate_feed_counts,
+    reset_feed_clock
+)
+from .images import build_thumbnails, strip_exif
+from .models import FeedEntry, Post, Task
+
+logger = logging.getLogger('blog.tasks')
+
+_registry = {}
+
+
+def task(name, max_attempts=3):
+    """
+    Регистрирует функцию как фоновую задачу.
+    Args:
+        name: Уникальное имя задачи в очереди
+        max_attempts: Сколько раз пытаться выполнить задачу
+    """
+
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, run_after=None, **payload):
+    """
+    Ставит задачу в очередь. Запись создается в текущей транзакции,
+    поэтому задача не потеряется и не выполнится раньше ее фиксации.
+    При BLOG_TASKS_EAGER задача выполняется сразу в текущем потоке.
+    Args:
+        name: Имя зарегистрированной задачи
+        run_after: Время, не раньше которого выполнять задачу
+        payload: Именованные аргументы задачи (сериализуемые в JSON)
+    Returns:
+        Созданная запись Task
+    """
+
+    func = _registry[name]
+    queued = Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=func.max_attempts,
+        run_after=run_after or timezone.now()
+    )
+    if getattr(settings, 'BLOG_TASKS_EAGER', False) and run_after is None:
+        if _claim(Task.objects.filter(pk=queued.pk, status=Task.PENDING)):
+            queued.attempts += 1
+            run_task(queued)
+    return queued
+
+
+def _claim(queryset):
+    """
+    Переводит задачи в RUNNING условным UPDATE и засчитывает попытку
+    сразу при захвате: задача, на которой обработчик упал, не будет
+    повторяться бесконечно.
+    """
+
+    return queryset.update(
+        status=Task.RUNNING,
+        claimed_at=timezone.now(),
+        attempts=F('attempts') + 1
+    )
+
+
+def lease_cutoff(now):
+    """Задачи RUNNING, захваченные раньше этого момента, брошены."""
+
+    return now - timedelta(
+        seconds=getattr(settings, 'BLOG_TASKS_LEASE', 600)
+    )
+
+
+def claimable(now):
+    """
+    Условие задач, которые можно захватить: ожидающие, время которых
+    наступило, и RUNNING, чей обработчик не завершил их за
+    BLOG_TASKS_LEASE секунд (упал или был остановлен).
+    """
+
+    return Q(status=Task.PENDING, run_after__lte=now) | Q(
+        status=Task.RUNNING, claimed_at__lt=lease_cutoff(now),
+        attempts__lt=F('max_attempts')
+    )
+
+
+def fail_abandoned_tasks(now):
+    """
+    Помечает как FAILED задачи с истекшей арендой, у которых не
+    осталось попыток.
+    """
+
+    return Task.objects.filter(
+        status=Task.RUNNING, claimed_at__lt=lease_cutoff(now),
+        attempts__gte=F('max_attempts')
+    ).update(
+        status=Task.FAILED,
+        last_error='Обработчик не завершил задачу за BLOG_TASKS_LEASE.',
+        updated_at=now
+    )
+
+
+def claim_tasks(limit):
+    """
+    Забирает из очереди до limit задач, время которых наступило,
+    и задачи, брошенные упавшим обработчиком (см. claimable).
+    Задача переводится в RUNNING условным UPDATE, поэтому ее не заберут
+    два обработчика одновременно.
+    Returns:
+        Список захваченных задач
+    """
+
+    now = timezone.now()
+    fail_abandoned_tasks(now)
+    candidates = Task.objects.filter(
+        claimable(now)
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        with transaction.atomic():
+            if _claim(Task.objects.filter(claimable(now), pk=pk)):
+                claimed.append(Task.objects.get(pk=pk))
+    return claimed
+
+
+def run_task(queued):
+    """
+    Выполняет захваченную задачу. При ошибке задача возвращается
+    в очередь с экспоненциальной задержкой, а после исчерпания
+    попыток помечается как FAILED.
+    """
+
+    try:
+        _registry[queued.name](**queued.payload)
+    except Exception:
+        queued.last_error = traceback.format_exc()
+        if queued.attempts >= queued.max_attempts:
+            queued.status = Task.FAILED
+            logger.exception('Задача %s завершилась ошибкой', queued)
+        else:
+            queued.status = Task.PENDING
+            queued.run_after = timezone.now() + timedelta(
+                seconds=getattr(settings, 'BLOG_TASKS_RETRY_DELAY', 10)
+                * 2 ** (queued.attempts - 1)
+            )
+    else:
+        queued.status = Task.DONE
+        queued.last_error = ''
+    queued.save(update_fields=(
+        'status', 'attempts', 'run_after', 'last_error', 'updated_at'
+    ))
+
+
+@task('blog.process_post_image')
+def process_post_image(post_id):
+    """Удаляет EXIF из изображения поста и строит его уменьшенные копии."""
+
+    post = Post.objects.select_related('category').filter(
+        pk=post_id
+    ).first()
+    if post is None or not post.image:
+        return
+    strip_exif(post.image)
+    widths = build_thumbnails(post.image)
+    # Если изображение успели заменить, его копии построит новая задача
+    Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        thumbnails=widths
+    )
+    # Карточки и страницы, отрендеренные с оригиналом, перестраиваются
+    pages = ['feed:index', f'detail:{post.id}']
+    if post.category is not None:
+        pages.append(f'feed:category:{post.category.slug}')
+    bump_versions(f'post:{post.id}', *pages)
+
+
+@task('blog.publish_post')
+def publish_post(post_id):
+    """
+    Событие публикации отложенного поста, запланированное на его
+    pub_date: сбрасывает страницы и счётчики лент, в которые пост
+    только что попал, и заново прогревает счётчики и «часы» лент.
+    Если дату публикации перенесли на будущее, ничего не делает —
+    для новой даты запланировано свое событие.
+    """
+
+    entry = FeedEntry.objects.filter(
+        post_id=post_id, is_visible=True, pub_date__lte=timezone.now()
+    ).select_related('category').first()
+    if entry is None:
+        return
+    category_feed = f'category:{entry.category_id}'
+    invalidate_feed_counts(
+        'index', category_feed, f'author:{entry.author_id}'
+    )
+    reset_feed_clock()
+    bump_versions(
+        'feed:index', f'feed:category:{entry.category.slug}',
+        f'detail:{post_id}'
+    )
+    visible = FeedEntry.objects.visible()
+    get_feed_count('index', visible.count)
+    get_feed_count(
+        category_feed, visible.filter(category_id=entry.category_id).count
+    )
+    feed_valid_until()
+
+
+@task('blog.send_email', max_attempts=5)
+def send_email(subject, body, from_email, to, cc=(), bcc=(), reply_to=(),
+               alternatives=(), headers=None):
+    """Отправляет письмо бэкендом BLOG_TASKS_EMAIL_BACKEND."""
+
+    message = EmailMultiAlternatives(
+        subject, body, from_email, to, cc=cc, bcc=bcc, reply_to=reply_to,
+        headers=headers,
+        alternatives=[tuple(alternative) for alternative in alternatives],
+        connection=get_connection(settings.BLOG_TASKS_EMAIL_BACKEND)
+    )
+    message.send()
@@ -0,0 +1,22 @@
+from django import template
+
+from blog.images import picture_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(image, variant='feed', css_class=''):
+    """
+    Выводит изображение поста тегом <picture> с srcset из уменьшенных
+    копий в WebP и JPEG.
+    Args:
+        image: Значение ImageField поста
+        variant: 'feed' или 'detail'
+        css_class: CSS-классы тега <img>
+    """
+
+    return {
+        'sources': picture_sources(image, variant),
+        'css_class': css_class,
+    }
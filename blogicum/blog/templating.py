@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def iter_template_names(engine):
+    """
+    Имена всех шаблонов из каталогов DIRS движка (templates/ проекта)
+    в том виде, в каком их передают в get_template.
+    """
+
+    for directory in engine.engine.dirs:
+        root = Path(directory)
+        for path in sorted(root.rglob('*')):
+            if path.is_file() and path.suffix in TEMPLATE_SUFFIXES:
+                yield path.relative_to(root).as_posix()
+
+
+def django_engines():
+    return [
+        engine for engine in engines.all()
+        if hasattr(engine, 'engine')  # Только движки Django Templates
+    ]
+
+
+def compile_templates():
+    """
+    Загружает и компилирует все шаблоны проекта. При кэширующем
+    загрузчике скомпилированные шаблоны остаются в его кэше.
+    Returns:
+        Число скомпилированных шаблонов и список пар
+        (имя шаблона, ошибка)
+    """
+
+    compiled, errors = 0, []
+    for engine in django_engines():
+        for name in iter_template_names(engine):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as error:
+                errors.append((name, error))
+            else:
+                compiled += 1
+    return compiled, errors
+
+
+def warm_templates():
+    """
+    Прогревает кэширующий загрузчик при старте процесса, чтобы первый
+    запрос после деплоя или перезапуска воркера не компилировал шаблоны.
+    Выполняется, если включена настройка BLOG_WARM_TEMPLATES.
+    """
+
+    if getattr(settings, 'BLOG_WARM_TEMPLATES', False):
+        compile_templates()
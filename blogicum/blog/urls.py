@@ -8,6 +8,9 @@ urlpatterns = [
     path('posts/<int:id>/', views.post_detail, name='post_detail'),
     path('category/<slug:category_slug>/', views.category_posts,
          name='category_posts'),
+    path('search/', views.search, name='search'),
+    path('locations/autocomplete/', views.location_autocomplete,
+         name='location_autocomplete'),
     # Редактирование и профиль пользователя
     path('profile/edit/', views.edit_profile, name='edit_profile'),
     path('profile/<str:username>/', views.profile, name='profile'),
@@ -16,9 +19,13 @@ urlpatterns = [
     path('posts/<int:id>/edit/', views.edit_post, name='edit_post'),
     path('posts/<int:id>/delete/', views.delete_post, name='delete_post'),
     # Комментарии
+    path('posts/<int:id>/comments/', views.post_comments,
+         name='post_comments'),
     path('posts/<int:id>/comment/', views.add_comment, name='add_comment'),
     path('posts/<int:id>/edit_comment/<int:comment_id>/',
          views.edit_comment, name='edit_comment'),
     path('posts/<int:id>/delete_comment/<int:comment_id>/',
          views.delete_comment, name='delete_comment'),
+    # Выгрузка данных для персонала
+    path('export/', views.export_data, name='export'),
 ]
@@ -1,32 +1,85 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.db import transaction
 from django.utils import timezone
-from django.http import HttpResponseForbidden
+from django.http import (
+    HttpResponseBadRequest, HttpResponseForbidden, JsonResponse,
+    StreamingHttpResponse
+)
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.contrib.auth import get_user_model
-from .models import Post, Category, Comment
-from .forms import PostForm, CommentForm, ProfileForm
+from django.conf import settings
+from .models import Post, Category, Comment, FeedEntry, Location
+from .forms import PostForm, CommentForm, ProfileForm, ExportForm
+from .caching import cache_anonymous_page, render_post_cards
+from .export import EXPORT_FORMATS, iter_export
+from .pagination import FeedPaginator, KeysetPaginator
+from .routers import read_from_replica
+from .search import search_posts
+from .stats import get_user_stats
 
 User = get_user_model()
 
 
-def get_paginated_page(queryset, request, per_page=10):
+def get_paginated_page(queryset, request, per_page=10, keyset=None,
+                       feed=None, keys=('pub_date', 'id'), count=None):
     """
     Создает пагинатор и возвращает запрошенную страницу. 
     Args:
         queryset: QuerySet с объектами для пагинации
         request: HttpRequest объект для получения номера страницы
         per_page: количество объектов на странице (по умолчанию 10)
+        keyset: использовать ли keyset-пагинацию по (pub_date, id);
+            по умолчанию берется из настройки BLOG_KEYSET_PAGINATION,
+            а запрос с параметром ?after= всегда обслуживается ею
+        feed: имя ленты для кэширования общего числа объектов
+            (см. blog.caching.feed_count_key)
+        keys: поля ключа keyset-пагинации
+        count: заранее известное общее число объектов, если есть
     Returns:
         Page object с объектами для текущей страницы
     """
 
-    paginator = Paginator(queryset, per_page)
+    if keyset is None:
+        keyset = (
+            getattr(settings, 'BLOG_KEYSET_PAGINATION', False)
+            or 'after' in request.GET
+        )
+    if keyset:
+        paginator = KeysetPaginator(queryset, per_page, keys=keys)
+        return paginator.get_page(request.GET.get('after'))
+    paginator = FeedPaginator(queryset, per_page, feed=feed, count=count)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def get_feed_page(entries, request, feed):
+    """
+    Страница ленты из материализованной таблицы FeedEntry: записи
+    отбираются и сортируются по ее индексам, а посты со связанными
+    объектами подгружаются тем же запросом.
+    Args:
+        entries: QuerySet записей FeedEntry
+        request: HttpRequest объект для получения номера страницы
+        feed: имя ленты для кэширования общего числа объектов
+    Returns:
+        Страница, объекты которой — посты
+    """
+
+    page = get_paginated_page(
+        entries.with_posts().order_by('-pub_date', '-post_id'),
+        request,
+        feed=feed,
+        keys=('pub_date', 'post_id')
+    )
+    page.object_list = [entry.post for entry in page.object_list]
+    return page
+
+
+@read_from_replica
+@cache_anonymous_page(lambda: ('feed:index',))
 def index(request):
     """
     Главная страница с последними публикациями.
@@ -36,19 +89,52 @@ def index(request):
         Страницу с шаблоном blog/index.html с постами
     """
 
-    posts = Post.objects.filter(
-        is_published=True,
-        pub_date__lte=timezone.now(),
-        category__is_published=True
-    ).select_related('author', 'category', 'location').prefetch_related(
-        'comments').order_by('-pub_date')
-    page_obj = get_paginated_page(posts, request)
+    page_obj = render_post_cards(
+        get_feed_page(FeedEntry.objects.visible(), request, feed='index')
+    )
     return render(request, 'blog/index.html', {'page_obj': page_obj})
 
 
+def get_comments_page(post, request, per_page=20):
+    """
+    Возвращает страницу комментариев поста с keyset-пагинацией
+    по (created_at, id): от старых к новым, начиная после курсора ?after=.
+    Args:
+        post: Пост, комментарии которого выводятся
+        request: HttpRequest объект для получения курсора
+        per_page: количество комментариев на странице (по умолчанию 20)
+    Returns:
+        KeysetPage с комментариями
+    """
+
+    paginator = KeysetPaginator(
+        post.comments.select_related('author'),
+        per_page,
+        keys=('created_at', 'id'),
+        descending=False
+    )
+    return paginator.get_page(request.GET.get('after'))
+
+
+def get_visible_post(request, id):
+    """
+    Загружает пост, если он виден пользователю: автор видит свои посты
+    всегда, остальные — только опубликованные.
+    Returns:
+        Пост или None
+    """
+
+    post = get_object_or_404(Post.objects.with_feed_relations(), id=id)
+    if request.user != post.author and not post.is_visible():
+        return None
+    return post
+
+
+@read_from_replica
+@cache_anonymous_page(lambda id: (f'detail:{id}',))
 def post_detail(request, id):
     """
-    Отображает полный текст поста и комментарии к нему.
+    Отображает полный текст поста и первую страницу комментариев к нему.
     Автор видит все свои посты, включая отложенные и снятые с публикации.
     Остальные пользователи видят только опубликованные посты.
     Args:
@@ -59,19 +145,11 @@ def post_detail(request, id):
         blog/detail.html с выводом поста и комментариями"
     """
 
-    post = get_object_or_404(
-        Post.objects.select_related('author', 'category', 'location')
-        .prefetch_related('comments__author'),
-        id=id
-    )
-    can_view = (
-        post.is_published and post.pub_date <= timezone.now()
-        and post.category.is_published
-    )
-    if request.user != post.author and not can_view:
+    post = get_visible_post(request, id)
+    if post is None:
         return render(request, 'pages/404.html', status=404)
     form = CommentForm()
-    comments = post.comments.all()
+    comments = get_comments_page(post, request)
     return render(request, 'blog/detail.html', {
         'post': post,
         'form': form,
@@ -79,6 +157,33 @@ def post_detail(request, id):
     })
 
 
+@read_from_replica
+def post_comments(request, id):
+    """
+    Отдает следующую страницу комментариев поста для подгрузки.
+    Args:
+        request: HttpRequest объект
+        id: ID поста
+    Returns:
+        JSON с HTML-фрагментом комментариев (html) и курсором
+        следующей страницы (next) или null, если страниц больше нет
+    """
+
+    post = get_visible_post(request, id)
+    if post is None:
+        return JsonResponse({'error': 'not found'}, status=404)
+    comments = get_comments_page(post, request)
+    html = render_to_string('includes/comment_list.html', {
+        'post': post,
+        'comments': comments
+    }, request=request)
+    return JsonResponse({'html': html, 'next': comments.next_cursor})
+
+
+@read_from_replica
+@cache_anonymous_page(
+    lambda category_slug: (f'feed:category:{category_slug}',)
+)
 def category_posts(request, category_slug):
     """
     Отображает все посты определенной категории.
@@ -94,20 +199,54 @@ def category_posts(request, category_slug):
         slug=category_slug,
         is_published=True
     )
-    posts = Post.objects.filter(
-        category=category,
-        is_published=True,
-        pub_date__lte=timezone.now()
-    ).select_related('author', 'location').prefetch_related(
-        'comments'
-    ).order_by('-pub_date')
-    page_obj = get_paginated_page(posts, request)
+    entries = FeedEntry.objects.visible().filter(category=category)
+    page_obj = render_post_cards(get_feed_page(
+        entries, request, feed=f'category:{category.id}'
+    ))
     return render(request, 'blog/category.html', {
         'category': category,
         'page_obj': page_obj
     })
 
 
+@read_from_replica
+def search(request):
+    """
+    Полнотекстовый поиск по заголовкам и текстам опубликованных постов.
+    Выдача упорядочена по релевантности и листается по курсору ?after=.
+    Args:
+        request: HttpRequest с запросом в параметре q
+    Returns:
+        Рендерит шаблон blog/search.html с найденными постами
+    """
+
+    query = request.GET.get('q', '').strip()
+    page_obj = render_post_cards(
+        search_posts(query, request.GET.get('after'))
+    )
+    return render(request, 'blog/search.html', {
+        'query': query,
+        'page_obj': page_obj
+    })
+
+
+def location_autocomplete(request):
+    """
+    Подсказки местоположений для поля PostForm.location: опубликованные
+    места, название которых начинается с введенного текста.
+    Args:
+        request: HttpRequest с префиксом названия в параметре q
+    Returns:
+        JSON со списком results из объектов {id, name}
+    """
+
+    locations = Location.objects.autocomplete(
+        request.GET.get('q', ''),
+        limit=settings.BLOG_LOCATION_AUTOCOMPLETE_LIMIT
+    ).values('id', 'name')
+    return JsonResponse({'results': list(locations)})
+
+
 @login_required
 def create_post(request):
     """
@@ -208,7 +347,9 @@ def add_comment(request, id):
             comment = form.save(commit=False)  # Не сохраняем сразу
             comment.post = post  # Привязываем к посту
             comment.author = request.user  # Устанавливаем автора
-            comment.save()  # Теперь сохраняем
+            # Комментарий и счётчик поста сохраняются в одной транзакции
+            with transaction.atomic():
+                comment.save()
     return redirect('blog:post_detail', id=id)
 
 
@@ -270,6 +411,7 @@ def delete_comment(request, id, comment_id):
     })
 
 
+@read_from_replica
 def profile(request, username):
     """
     Отображает профиль пользователя и его публикации.
@@ -282,20 +424,26 @@ def profile(request, username):
         Рендерит шаблон blog/profile.html с данными пользователя
     """
 
-    profile_user = get_object_or_404(User, username=username)
+    profile_user = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    stats = get_user_stats(profile_user)
+    posts = profile_user.posts.all()
+    count = None
     if request.user == profile_user:
-        posts = profile_user.posts.all()
+        feed = f'author:{profile_user.id}:all'
+        # Все посты автора уже посчитаны в статистике
+        count = stats.post_count if stats is not None else None
     else:
-        posts = profile_user.posts.filter(
-            is_published=True,
-            pub_date__lte=timezone.now()
-        )
-    posts = posts.select_related('category', 'location').prefetch_related(
-        'comments'
-    ).order_by('-pub_date')
-    page_obj = get_paginated_page(posts, request)
+        posts = posts.published()
+        feed = f'author:{profile_user.id}'
+    posts = posts.with_feed_relations()
+    page_obj = render_post_cards(
+        get_paginated_page(posts, request, feed=feed, count=count)
+    )
     return render(request, 'blog/profile.html', {
         'profile': profile_user,
+        'stats': stats,
         'page_obj': page_obj
     })
 
@@ -321,3 +469,31 @@ def edit_profile(request):
     else:
         form = ProfileForm(instance=request.user)
     return render(request, 'blog/user.html', {'form': form})
+
+
+@staff_member_required
+def export_data(request):
+    """
+    Потоковая выгрузка постов или комментариев для аналитики.
+    Строки читаются из БД пачками и сразу отдаются клиенту,
+    поэтому память не зависит от объема выгрузки.
+    Доступна только персоналу.
+    Args:
+        request: HttpRequest с параметрами ExportForm в GET
+    Returns:
+        StreamingHttpResponse с файлом JSONL или CSV
+    """
+
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    kind = form.cleaned_data['kind']
+    export_format = form.cleaned_data['format']
+    response = StreamingHttpResponse(
+        iter_export(kind, export_format, **form.export_filters()),
+        content_type=f'{EXPORT_FORMATS[export_format]}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="blogicum-{kind}.{export_format}"'
+    )
+    return response
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# Импорт после настройки Django: приложениям нужен загруженный реестр
+from blog.templating import warm_templates  # noqa: E402
+
+warm_templates()
@@ -0,0 +1,20 @@
+"""
+Настройки Blogicum. Профиль выбирается переменной окружения
+BLOGICUM_ENV: dev (по умолчанию) или prod. Профиль можно указать
+и напрямую: DJANGO_SETTINGS_MODULE=blogicum.settings.prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BLOGICUM_ENV = os.environ.get('BLOGICUM_ENV', 'dev')
+
+if BLOGICUM_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif BLOGICUM_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль настроек BLOGICUM_ENV={BLOGICUM_ENV!r}: '
+        f'ожидается dev или prod.'
+    )
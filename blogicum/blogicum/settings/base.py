@@ -0,0 +1,261 @@
+"""
+Общие настройки Blogicum для всех окружений.
+
+Окружение выбирается переменной BLOGICUM_ENV (dev или prod, см.
+blogicum/settings/__init__.py); значения, зависящие от окружения,
+читаются из переменных окружения с префиксом BLOGICUM_.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/3.2/ref/settings/
+"""
+import os
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+
+def env(name, default=None):
+    """
+    Значение переменной окружения BLOGICUM_<name>.
+    Без значения по умолчанию отсутствие переменной — ошибка настройки.
+    """
+
+    value = os.environ.get(f'BLOGICUM_{name}', default)
+    if value is None:
+        raise ImproperlyConfigured(
+            f'Не задана переменная окружения BLOGICUM_{name}.'
+        )
+    return value
+
+
+def env_bool(name, default):
+    return env(name, str(default)).strip().lower() in ('1', 'true', 'yes')
+
+
+def env_int(name, default):
+    return int(env(name, str(default)))
+
+
+def env_list(name, default=None):
+    """Список из значения переменной, разделенного запятыми."""
+
+    value = env(name, None if default is None else ','.join(default))
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+# SECRET_KEY и DEBUG задают профили: dev — со значениями по умолчанию
+# для локальной разработки, prod — только из окружения
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', ['127.0.0.1', 'localhost'])
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'django_bootstrap5',
+    'blog.apps.BlogConfig',
+    'pages.apps.PagesConfig',
+]
+
+MIDDLEWARE = [
+    'blog.middleware.SQLProfilerMiddleware',
+    'blog.middleware.PrimaryStickinessMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'blogicum.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],  # настройка
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'blogicum.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': env('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        'USER': env('DB_USER', ''),
+        'PASSWORD': env('DB_PASSWORD', ''),
+        'HOST': env('DB_HOST', ''),
+        'PORT': env('DB_PORT', ''),
+    }
+}
+
+
+# Реплики только для чтения (см. blog/routers.py): имена БД через
+# запятую, для SQLite — пути к копиям файла основной БД. Чтение в лентах
+# идет на реплики, а после записи пользователь на
+# BLOG_PRIMARY_STICKY_SECONDS секунд остается на основной БД
+for number, name in enumerate(env_list('DB_REPLICAS', []), start=1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'], 'NAME': name, 'TEST': {}
+    }
+BLOG_READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+BLOG_PRIMARY_STICKY_SECONDS = env_int('PRIMARY_STICKY_SECONDS', 5)
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# PRAGMA для каждого соединения с SQLite (см. blog/database.py): WAL
+# и ожидание блокировки вместо ошибки «database is locked» при
+# одновременной записи, synchronous=NORMAL без fsync на каждую
+# транзакцию, отображение файла в память и кэш страниц (в КиБ при
+# отрицательном значении)
+BLOG_SQLITE_PRAGMAS = {
+    'busy_timeout': env_int('SQLITE_BUSY_TIMEOUT', 5000),
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+    'cache_size': env_int('SQLITE_CACHE_SIZE', -64 * 1024),
+    'temp_store': 'MEMORY',
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/3.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru-RU'
+
+TIME_ZONE = 'Europe/Moscow'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Default primary key field type
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Статические файлы (CSS, JavaScript, Images)
+STATIC_URL = '/static/'
+
+# Папка для collectstatic (для продакшена)
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Указываем существующую папку static_dev
+STATICFILES_DIRS = [
+    os.path.join(BASE_DIR, 'static'),
+]
+
+# Медиа файлы (загружаемые пользователями)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Ширины уменьшенных копий изображений постов (WebP и JPEG)
+BLOG_THUMBNAIL_WIDTHS = {'feed': 640, 'detail': 1280}
+
+# Настройки для кастомных страниц ошибок
+CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'  # Для 403 CSRF
+
+# Настройки для аутентификации
+LOGIN_URL = 'login'
+LOGIN_REDIRECT_URL = 'blog:index'
+LOGOUT_REDIRECT_URL = 'blog:index'
+
+# Настройки для отправки почты: письма ставятся в очередь фоновых задач,
+# а обработчик (manage.py runworker) отправляет их файловым бэкендом
+EMAIL_BACKEND = 'blog.mail.QueuedEmailBackend'
+BLOG_TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Очередь фоновых задач: выполнять ли задачи сразу в потоке запроса,
+# базовая пауза перед повтором упавшей задачи и аренда захваченной
+# задачи (после нее задачу упавшего обработчика забирает другой), секунды
+BLOG_TASKS_EAGER = False
+BLOG_TASKS_RETRY_DELAY = 10
+BLOG_TASKS_LEASE = 600
+
+# Keyset-пагинация лент по (pub_date, id) вместо COUNT(*) и OFFSET
+BLOG_KEYSET_PAGINATION = False
+
+# Кэш общего числа постов в лентах (сбрасывается сигналами моделей)
+BLOG_CACHE_ALIAS = 'default'
+BLOG_FEED_COUNT_TIMEOUT = 60
+# Кэш отрендеренных карточек постов (ключ включает метки версий)
+BLOG_POST_CARD_TIMEOUT = 60 * 60 * 24
+# Кэш страниц для анонимных пользователей, секунды (0 — отключён)
+BLOG_PAGE_CACHE_TIMEOUT = env_int('PAGE_CACHE_TIMEOUT', 0)
+# Сколько хранить момент ближайшей отложенной публикации, если
+# отложенных постов нет (сбрасывается сигналами моделей)
+BLOG_FEED_CLOCK_TIMEOUT = 60 * 60
+# Сколько подсказок возвращает автодополнение местоположений
+BLOG_LOCATION_AUTOCOMPLETE_LIMIT = 10
+# Компилировать все шаблоны при старте WSGI/ASGI-процесса (имеет смысл
+# с кэширующим загрузчиком, см. blogicum/settings/prod.py)
+BLOG_WARM_TEMPLATES = False
+
+# Профилирование SQL-запросов и поиск N+1 (заголовок X-SQL-Profile);
+# включается профилем dev
+SQL_PROFILER_ENABLED = False
+SQL_PROFILER_N_PLUS_ONE_THRESHOLD = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blog.sql': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
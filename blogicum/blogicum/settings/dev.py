@@ -0,0 +1,25 @@
+"""
+Настройки для локальной разработки: отладка и профилирование SQL
+включены, секретный ключ и база SQLite заданы по умолчанию.
+Фоновые задачи выполняются сразу в потоке запроса, поэтому письма
+попадают в sent_emails/ без запущенного manage.py runworker
+(BLOGICUM_TASKS_EAGER=0 возвращает очередь).
+Использование:
+    BLOGICUM_ENV=dev (по умолчанию) или
+    DJANGO_SETTINGS_MODULE=blogicum.settings.dev
+"""
+from .base import *  # noqa: F401,F403
+from .base import env, env_bool
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = env(
+    'SECRET_KEY',
+    'django-insecure-cq26%bp*zm&-)8+r3@m*ypm-=!dxx)*p+nev^b&ihy&hb0_-+q'
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env_bool('DEBUG', True)
+
+SQL_PROFILER_ENABLED = DEBUG
+
+BLOG_TASKS_EAGER = env_bool('TASKS_EAGER', True)
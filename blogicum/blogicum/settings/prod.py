@@ -0,0 +1,104 @@
+"""
+Настройки для продакшена. Секретный ключ и разрешенные хосты берутся
+только из окружения; соединения с БД переиспользуются, кэш, сессии
+и версии закэшированных страниц хранятся в общем для процессов кэше.
+Шаблоны загружаются кэширующим загрузчиком и компилируются один раз
+при старте процесса (BLOG_WARM_TEMPLATES), а не при первом запросе.
+Использование:
+    BLOGICUM_ENV=prod или DJANGO_SETTINGS_MODULE=blogicum.settings.prod
+Переменные окружения (с префиксом BLOGICUM_):
+    SECRET_KEY, ALLOWED_HOSTS — обязательные
+    DB_ENGINE, DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    CONN_MAX_AGE — сколько секунд держать соединение с БД (60)
+    CACHE_BACKEND, CACHE_LOCATION — кэш (memcached на 127.0.0.1:11211;
+        бэкенд PyMemcacheCache требует пакет pymemcache)
+    PAGE_CACHE_TIMEOUT — кэш страниц для анонимов, секунды (60)
+    LOG_LEVEL — уровень журнала (INFO)
+"""
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, TEMPLATES, env, env_int, env_list
+
+SECRET_KEY = env('SECRET_KEY')
+DEBUG = False
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS')
+
+# Постоянные соединения с БД вместо нового соединения на каждый запрос
+DATABASES = {
+    alias: {**database, 'CONN_MAX_AGE': env_int('CONN_MAX_AGE', 60)}
+    for alias, database in DATABASES.items()
+}
+
+# Метки версий и счетчики лент должны быть общими для всех процессов,
+# поэтому локальный кэш процесса (LocMemCache) здесь не подходит
+CACHES = {
+    'default': {
+        'BACKEND': env(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.memcached.PyMemcacheCache'
+        ),
+        'LOCATION': env('CACHE_LOCATION', '127.0.0.1:11211'),
+        'KEY_PREFIX': 'blogicum',
+    }
+}
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Имена файлов с хэшем содержимого: статику можно кэшировать навсегда
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)
+
+BLOG_PAGE_CACHE_TIMEOUT = env_int('PAGE_CACHE_TIMEOUT', 60)
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    # Загрузчики заданы явно, поэтому APP_DIRS выключен: шаблоны
+    # приложений ищет app_directories.Loader
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'debug': False,
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+BLOG_WARM_TEMPLATES = True
+
+LOG_LEVEL = env('LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '{asctime} {levelname} {name} {process:d} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'verbose',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        # Ошибки запросов (5xx и 4xx) пишутся, остальное — по LOG_LEVEL
+        'django.request': {
+            'level': 'WARNING',
+        },
+        # SQL пишется только на уровне DEBUG, в продакшене не нужен
+        'django.db.backends': {
+            'level': 'WARNING',
+        },
+        'blog.sql': {
+            'level': 'WARNING',
+        },
+    },
+}
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Импорт после настройки Django: приложениям нужен загруженный реестр
+from blog.templating import warm_templates  # noqa: E402
+
+warm_templates()
@@ -0,0 +1,20 @@
+// Подгрузка следующих страниц комментариев без перезагрузки страницы.
+document.addEventListener('click', function (event) {
+  var button = event.target.closest('[data-more-comments]');
+  if (!button) {
+    return;
+  }
+  event.preventDefault();
+  var url = button.dataset.moreComments + '?after=' + encodeURIComponent(button.dataset.after);
+  fetch(url, {headers: {'Accept': 'application/json'}})
+    .then(function (response) { return response.json(); })
+    .then(function (data) {
+      document.getElementById('comments').insertAdjacentHTML('beforeend', data.html);
+      if (data.next) {
+        button.dataset.after = data.next;
+        button.href = '?after=' + data.next + '#comments';
+      } else {
+        button.remove();
+      }
+    });
+});
@@ -0,0 +1,70 @@
+// Автодополнение местоположения: вместо полного списка <option> поле
+// получает текстовый ввод, а варианты подгружаются по мере набора.
+document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+  var input = document.createElement('input');
+  var list = document.createElement('datalist');
+  // Подпись варианта в списке -> id местоположения
+  var ids = {};
+  var timer = null;
+  list.id = select.id + '-options';
+  input.type = 'text';
+  input.className = 'form-control';
+  input.autocomplete = 'off';
+  input.placeholder = 'Начните вводить название';
+  input.setAttribute('list', list.id);
+  if (select.value) {
+    input.value = select.options[select.selectedIndex].text;
+    ids[input.value] = select.value;
+  }
+
+  // Текст, не совпадающий с подписью варианта, сбрасывает выбор:
+  // иначе форма отправила бы прежнее местоположение
+  function choose() {
+    var id = ids[input.value];
+    if (id === undefined) {
+      select.value = '';
+      return;
+    }
+    if (!select.querySelector('option[value="' + id + '"]')) {
+      select.add(new Option(input.value, id));
+    }
+    select.value = String(id);
+  }
+
+  // Одноименные местоположения различаются номером в подписи
+  function labels(results) {
+    var counts = {};
+    results.forEach(function (location) {
+      counts[location.name] = (counts[location.name] || 0) + 1;
+    });
+    return results.map(function (location) {
+      return counts[location.name] > 1
+        ? location.name + ' (№' + location.id + ')'
+        : location.name;
+    });
+  }
+
+  function load() {
+    var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(input.value);
+    fetch(url, {headers: {'Accept': 'application/json'}})
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        list.innerHTML = '';
+        labels(data.results).forEach(function (label, index) {
+          ids[label] = data.results[index].id;
+          list.appendChild(new Option(label));
+        });
+        choose();
+      });
+  }
+
+  input.addEventListener('input', function () {
+    choose();
+    clearTimeout(timer);
+    if (input.value.trim()) {
+      timer = setTimeout(load, 200);
+    }
+  });
+  select.hidden = true;
+  select.after(input, list);
+});
@@ -18,7 +18,9 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.conf import settings as django_settings
 from django.contrib.auth import get_user_model
+from django.db import connections
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +43,23 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def queue_tasks():
+    # В профиле dev задачи выполняются сразу; тесты проверяют очередь
+    with override_settings(BLOG_TASKS_EAGER=False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Откат транзакции между тестами не вызывает сигналов моделей,
+    # поэтому кэш, сбрасываемый ими, очищается явно
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -87,6 +106,16 @@ with SafeImportFromContextManager(
                     f"{need_app_name}"
                 )
 
+# Отдельная тестовая БД-реплика для проверки маршрутизации чтения
+# (tests/test_replica_router.py); пока BLOG_READ_REPLICAS пуст, запросы
+# в нее не направляются
+if "replica" not in django_settings.DATABASES:
+    django_settings.DATABASES["replica"] = {
+        **django_settings.DATABASES["default"], "TEST": {}
+    }
+    connections.ensure_defaults("replica")
+    connections.prepare_test_settings("replica")
+
 pytest_plugins = [
     "fixtures.posts",
     "fixtures.locations",
@@ -363,6 +392,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,254 @@
+"""Бенчмарк маршрутов блога: число запросов к БД, задержка и память.
+
+Размер данных и пороги задаются переменными окружения:
+    BLOGICUM_BENCH_POSTS — число постов (по умолчанию 30);
+    BLOGICUM_BENCH_COMMENTS — комментариев на пост (по умолчанию 3);
+    BLOGICUM_BENCH_USERS — число авторов (по умолчанию 5);
+    BLOGICUM_BENCH_FIXTURE — путь к фикстуре вроде db.json, которая
+        загружается вместо сгенерированных mixer данных;
+    BLOGICUM_BENCH_REPEAT — повторов каждого запроса (по умолчанию 5);
+    BLOGICUM_BENCH_TIMING — 1, чтобы проверять пороги задержки и памяти
+        (по умолчанию выключено: они зависят от машины);
+    BLOGICUM_BENCH_MAX_P95_MS — порог p95 задержки (по умолчанию 500);
+    BLOGICUM_BENCH_MAX_PEAK_KB — порог пиковой памяти (по умолчанию 20480);
+    BLOGICUM_BENCH_REPORT — файл для отчёта в формате JSON.
+
+Порог числа запросов задан для каждого маршрута в QUERY_BUDGET и не
+зависит от объёма данных: его превышение означает N+1. Он проверяется
+всегда, задержка и память без BLOGICUM_BENCH_TIMING только попадают
+в отчёт.
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, NamedTuple
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+
+BENCH_POSTS = int(os.getenv("BLOGICUM_BENCH_POSTS", 30))
+BENCH_COMMENTS = int(os.getenv("BLOGICUM_BENCH_COMMENTS", 3))
+BENCH_USERS = int(os.getenv("BLOGICUM_BENCH_USERS", 5))
+BENCH_FIXTURE = os.getenv("BLOGICUM_BENCH_FIXTURE")
+BENCH_REPEAT = int(os.getenv("BLOGICUM_BENCH_REPEAT", 5))
+BENCH_TIMING = os.getenv("BLOGICUM_BENCH_TIMING") == "1"
+MAX_P95_MS = float(os.getenv("BLOGICUM_BENCH_MAX_P95_MS", 500))
+MAX_PEAK_KB = float(os.getenv("BLOGICUM_BENCH_MAX_PEAK_KB", 20480))
+BENCH_REPORT = os.getenv("BLOGICUM_BENCH_REPORT")
+
+# Маршруты, которые не измеряются, и причина
+SKIPPED_ROUTES = {
+    "pages:create": "у PageCreateView не задана модель",
+    "pages:edit": "у PageUpdateView не задана модель",
+    "pages:delete": "у PageDeleteView не задана модель",
+}
+
+
+class Route(NamedTuple):
+    url: str
+    method: str
+    client: str  # "anonymous", "author" или "staff"
+    data: dict = {}
+
+
+# Максимум запросов к БД на один запрос при пустом кэше
+QUERY_BUDGET = {
+    "blog:index": 2,
+    "blog:post_detail": 2,
+    "blog:category_posts": 3,
+    "blog:search": 2,
+    "blog:location_autocomplete": 1,
+    "blog:edit_profile": 2,
+    "blog:profile": 3,
+    "blog:create_post": 5,
+    "blog:edit_post": 7,
+    "blog:delete_post": 4,
+    "blog:add_comment": 10,
+    "blog:post_comments": 2,
+    "blog:edit_comment": 4,
+    "blog:delete_comment": 4,
+    "blog:export": 3,
+    "pages:about": 0,
+    "pages:rules": 0,
+    "pages:registration": 0,
+}
+
+
+def _route_names(resolver, namespace=""):
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            inner = f"{namespace}{pattern.namespace}:" if (
+                pattern.namespace) else namespace
+            yield from _route_names(pattern, inner)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f"{namespace}{pattern.name}"
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+@pytest.fixture
+def bench_data(mixer):
+    # Фикстура загружается первой: она задаёт явные pk, которые иначе
+    # перезаписали бы созданные здесь объекты
+    if BENCH_FIXTURE:
+        call_command("loaddata", BENCH_FIXTURE, verbosity=0)
+    else:
+        authors = mixer.cycle(BENCH_USERS).blend("auth.User")
+        categories = mixer.cycle(3).blend("blog.Category", is_published=True)
+        locations = mixer.cycle(5).blend("blog.Location", is_published=True)
+        posts = mixer.cycle(BENCH_POSTS).blend(
+            "blog.Post",
+            author=mixer.sequence(*authors),
+            category=mixer.sequence(*categories),
+            location=mixer.sequence(*locations),
+            is_published=True,
+        )
+        for post in posts:
+            mixer.cycle(BENCH_COMMENTS).blend(
+                "blog.Comment", post=post, author=mixer.sequence(*authors)
+            )
+    user = mixer.blend("auth.User")
+    category = mixer.blend("blog.Category", is_published=True)
+    post = mixer.blend(
+        "blog.Post", author=user, category=category, is_published=True
+    )
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    return post, comment
+
+
+def _routes(post, comment) -> Dict[str, Route]:
+    post_url = f"/posts/{post.id}/"
+    return {
+        "blog:index": Route("/", "get", "anonymous"),
+        "blog:post_detail": Route(post_url, "get", "anonymous"),
+        "blog:category_posts": Route(
+            f"/category/{post.category.slug}/", "get", "anonymous"
+        ),
+        "blog:search": Route(
+            "/search/", "get", "anonymous", {"q": post.title.split()[0]}
+        ),
+        "blog:location_autocomplete": Route(
+            "/locations/autocomplete/", "get", "anonymous", {"q": "а"}
+        ),
+        "blog:edit_profile": Route("/profile/edit/", "get", "author"),
+        "blog:profile": Route(
+            f"/profile/{post.author.username}/", "get", "anonymous"
+        ),
+        "blog:create_post": Route("/posts/create/", "get", "author"),
+        "blog:edit_post": Route(f"{post_url}edit/", "get", "author"),
+        "blog:delete_post": Route(f"{post_url}delete/", "get", "author"),
+        "blog:add_comment": Route(
+            f"{post_url}comment/", "post", "author", {"text": "Бенчмарк"}
+        ),
+        "blog:post_comments": Route(
+            f"{post_url}comments/", "get", "anonymous"
+        ),
+        "blog:edit_comment": Route(
+            f"{post_url}edit_comment/{comment.id}/", "get", "author"
+        ),
+        "blog:delete_comment": Route(
+            f"{post_url}delete_comment/{comment.id}/", "get", "author"
+        ),
+        "blog:export": Route(
+            "/export/", "get", "staff", {"kind": "posts", "format": "csv"}
+        ),
+        "pages:about": Route("/pages/about/", "get", "anonymous"),
+        "pages:rules": Route("/pages/rules/", "get", "anonymous"),
+        "pages:registration": Route(
+            "/pages/auth/registration/", "get", "anonymous"
+        ),
+    }
+
+
+def _measure(request: Callable[[], object]) -> dict:
+    timings, queries, peaks = [], [], []
+    for _ in range(BENCH_REPEAT):
+        cache.clear()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = request()
+            if response.streaming:
+                # Запросы к БД потоковых ответов идут при чтении тела
+                b"".join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        queries.append(len(ctx.captured_queries))
+    assert response.status_code < 400, response.status_code
+    return {
+        "queries": max(queries),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "peak_kb": round(max(peaks), 1),
+    }
+
+
+@pytest.mark.django_db
+def test_route_benchmarks(bench_data, mixer):
+    post, comment = bench_data
+    routes = _routes(post, comment)
+    blog_and_pages = {
+        name for name in _route_names(get_resolver())
+        if name.split(":")[0] in ("blog", "pages")
+    }
+    unmeasured = blog_and_pages - set(routes) - set(SKIPPED_ROUTES)
+    assert not unmeasured, (
+        "Добавьте в бенчмарк маршруты: " + ", ".join(sorted(unmeasured))
+    )
+
+    author_client = Client()
+    author_client.force_login(post.author)
+    staff_client = Client()
+    staff_client.force_login(
+        mixer.blend("auth.User", is_staff=True, is_active=True)
+    )
+    clients = {
+        "anonymous": Client(), "author": author_client, "staff": staff_client
+    }
+    report, regressions = {}, []
+    for name, route in routes.items():
+        client = clients[route.client]
+        report[name] = result = _measure(
+            lambda: getattr(client, route.method)(route.url, route.data)
+        )
+        if result["queries"] > QUERY_BUDGET[name]:
+            regressions.append(
+                f"{name}: {result['queries']} запросов к БД при пороге"
+                f" {QUERY_BUDGET[name]}"
+            )
+        if not BENCH_TIMING:
+            continue
+        if result["p95_ms"] > MAX_P95_MS:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']} мс при пороге {MAX_P95_MS}"
+            )
+        if result["peak_kb"] > MAX_PEAK_KB:
+            regressions.append(
+                f"{name}: пик памяти {result['peak_kb']} КБ при пороге"
+                f" {MAX_PEAK_KB}"
+            )
+
+    if BENCH_REPORT:
+        with open(BENCH_REPORT, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+    lines = [
+        f"{name:24} {r['queries']:3} запросов  p50 {r['p50_ms']:8} мс"
+        f"  p95 {r['p95_ms']:8} мс  пик {r['peak_kb']:9} КБ"
+        for name, r in report.items()
+    ]
+    assert not regressions, (
+        "Регрессия производительности:\n" + "\n".join(regressions)
+        + "\n\n" + "\n".join(lines)
+    )
@@ -0,0 +1,105 @@
+import io
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from blog.models import Category, Comment, Location, Post
+from blog.streaming import iter_json_array
+
+FIXTURE = Path(__file__).resolve().parent.parent / "db.json"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 16])
+def test_iter_json_array_matches_json_load(chunk_size):
+    with open(FIXTURE, encoding="utf-8") as stream:
+        streamed = list(iter_json_array(stream, chunk_size))
+    assert streamed == json.loads(FIXTURE.read_text(encoding="utf-8")), (
+        "Убедитесь, что потоковый разбор фикстуры не зависит от размера"
+        " читаемых частей."
+    )
+    values = list(iter_json_array(io.StringIO('[125, 3.5, "a,]", {}]'), 1))
+    assert values == [125, 3.5, "a,]", {}], (
+        "Убедитесь, что числа и строки на границе частей не обрезаются."
+    )
+
+
+def test_iter_json_array_rejects_truncated_input():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"a": 1}, {"b"'), 4))
+
+
+@pytest.mark.django_db
+def test_bulk_loaddata_loads_db_json():
+    objects = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    out = StringIO()
+    call_command(
+        "bulk_loaddata", str(FIXTURE), batch_size=7, chunk_size=512,
+        stdout=out
+    )
+    for model, label in (
+        (Category, "blog.category"),
+        (Location, "blog.location"),
+        (get_user_model(), "auth.user"),
+        (Post, "blog.post"),
+    ):
+        expected = sum(1 for obj in objects if obj["model"] == label)
+        assert model.objects.count() == expected, (
+            f"Убедитесь, что команда bulk_loaddata загружает все объекты"
+            f" {label}."
+        )
+    for label in ("admin.logentry", "sessions.session"):
+        model = apps.get_model(label)
+        pks = [obj["pk"] for obj in objects if obj["model"] == label]
+        assert model.objects.filter(pk__in=pks).count() == len(pks), (
+            "Убедитесь, что bulk_loaddata загружает и модели не из"
+            f" LOAD_ORDER ({label}), как loaddata."
+        )
+    first = next(obj for obj in objects if obj["model"] == "blog.post")
+    post = Post.objects.get(pk=first["pk"])
+    assert post.created_at.isoformat().startswith(
+        first["fields"]["created_at"][:19]
+    ), "Убедитесь, что даты создания из фикстуры сохраняются."
+    assert "строк/с" in out.getvalue(), (
+        "Убедитесь, что команда bulk_loaddata сообщает скорость загрузки."
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_loaddata_loads_comments_and_counts(tmp_path, mixer):
+    author = mixer.blend("auth.User")
+    category = mixer.blend("blog.Category", is_published=True)
+    fixture = [
+        {
+            "model": "blog.comment", "pk": 10 + index,
+            "fields": {
+                "text": f"Комментарий {index}", "post": 500,
+                "author": author.pk, "created_at": "2023-01-01T00:00:00Z",
+            },
+        }
+        for index in range(3)
+    ] + [{
+        "model": "blog.post", "pk": 500,
+        "fields": {
+            "title": "Пост", "text": "Текст", "is_published": True,
+            "pub_date": "2023-01-01T00:00:00Z", "author": author.pk,
+            "category": category.pk, "location": None,
+            "created_at": "2023-01-01T00:00:00Z",
+        },
+    }]
+    path = tmp_path / "fixture.json"
+    path.write_text(json.dumps(fixture), encoding="utf-8")
+
+    call_command("bulk_loaddata", str(path), stdout=StringIO())
+    assert Comment.objects.filter(post_id=500).count() == 3, (
+        "Убедитесь, что комментарии загружаются после постов, даже если"
+        " в файле они идут раньше."
+    )
+    assert Post.objects.get(pk=500).comment_count == 3, (
+        "Убедитесь, что после загрузки пересчитываются счётчики"
+        " комментариев."
+    )
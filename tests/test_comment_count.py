@@ -0,0 +1,105 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import UserStats
+
+
+def _stored_count(post: Model) -> int:
+    post.refresh_from_db(fields=["comment_count"])
+    return post.comment_count
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    assert _stored_count(post) == 0
+
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Комментарий"}
+    )
+    assert response.status_code == 302
+    mixer.blend("blog.Comment", post=post)
+    assert _stored_count(post) == 2, (
+        "Убедитесь, что счётчик комментариев поста увеличивается при"
+        " добавлении комментария."
+    )
+
+    post.comments.first().delete()
+    assert _stored_count(post) == 1, (
+        "Убедитесь, что счётчик комментариев поста уменьшается при"
+        " удалении комментария."
+    )
+
+    post.comments.all().delete()
+    assert _stored_count(post) == 0, (
+        "Убедитесь, что массовое удаление комментариев обновляет счётчик."
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("rebuild_comment_counts", stdout=StringIO())
+    assert _stored_count(post) == 3, (
+        "Убедитесь, что команда `rebuild_comment_counts` пересчитывает"
+        " счётчики комментариев."
+    )
+
+
+@pytest.mark.django_db
+def test_feeds_do_not_load_comments(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(5).blend("blog.Comment", post=post)
+    live = type(post).objects.with_live_comment_counts().get(pk=post.pk)
+    assert live.live_comment_count == _stored_count(post) == 5
+
+    for url in (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ):
+        with CaptureQueriesContext(connection) as ctx:
+            content = user_client.get(url).content.decode()
+        assert "(5)" in content
+        comment_queries = [
+            q["sql"] for q in ctx.captured_queries
+            if '"blog_comment"' in q["sql"]
+        ]
+        assert not comment_queries, (
+            f"Убедитесь, что лента `{url}` не загружает комментарии, чтобы"
+            " вывести их число."
+        )
+
+
+@pytest.mark.django_db
+def test_post_delete_does_not_handle_each_comment(mixer, user, another_user):
+    def delete_queries(comments):
+        post = mixer.blend("blog.Post", author=user)
+        mixer.cycle(comments).blend(
+            "blog.Comment", post=post, author=another_user
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            post.delete()
+        return len(ctx.captured_queries)
+
+    few, many = delete_queries(2), delete_queries(20)
+    assert few == many, (
+        "Убедитесь, что удаление поста не обрабатывает каждый его"
+        " комментарий отдельными запросами: при 2 комментариях"
+        f" выполнено {few} запросов, при 20 — {many}."
+    )
+    stats = UserStats.objects.get(user=another_user)
+    assert stats.comment_count == 0, (
+        "Убедитесь, что удаление поста вычитает его комментарии из"
+        " статистики их авторов."
+    )
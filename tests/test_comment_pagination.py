@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated(
+        mixer, client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(25).blend("blog.Comment", post=post)
+
+    response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert len(page) == 20, (
+        "Убедитесь, что на странице поста выводится только первая страница"
+        " комментариев."
+    )
+    assert page.has_next()
+
+    more = client.get(
+        f"/posts/{post.id}/comments/", {"after": page.next_cursor}
+    ).json()
+    assert more["next"] is None
+    loaded = [f'name="comment_{c.id}"' for c in comments]
+    shown = response.content.decode() + more["html"]
+    assert all(anchor in shown for anchor in loaded), (
+        "Убедитесь, что по курсору подгружаются оставшиеся комментарии."
+    )
+
+
+@pytest.mark.django_db
+def test_comments_endpoint_hides_unpublished_post(
+        client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == 404
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.fixture
+def export_posts(mixer, user):
+    category = mixer.blend("blog.Category", slug="travel")
+    other = mixer.blend("blog.Category", slug="other")
+    now = timezone.now()
+    old = mixer.blend(
+        "blog.Post", author=user, category=category,
+        pub_date=now - timedelta(days=30)
+    )
+    recent = mixer.blend(
+        "blog.Post", author=user, category=category, pub_date=now
+    )
+    foreign = mixer.blend("blog.Post", category=other, pub_date=now)
+    mixer.cycle(2).blend("blog.Comment", post=recent, author=user)
+    return old, recent, foreign
+
+
+@pytest.mark.django_db
+def test_export_command_filters_posts(export_posts, user):
+    old, recent, foreign = export_posts
+    out = StringIO()
+    call_command(
+        "export_blog", "posts", "--category", "travel",
+        "--author", user.username,
+        "--since", (timezone.localdate() - timedelta(days=1)).isoformat(),
+        stdout=out
+    )
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row["id"] for row in rows] == [recent.id], (
+        "Убедитесь, что export_blog фильтрует посты по датам, категории"
+        " и автору."
+    )
+    assert rows[0]["author"] == user.username
+    assert rows[0]["category"] == "travel"
+    assert rows[0]["comment_count"] == 2
+
+
+@pytest.mark.django_db
+def test_export_command_writes_csv_file(export_posts, tmp_path):
+    path = tmp_path / "comments.csv"
+    stderr = StringIO()
+    call_command(
+        "export_blog", "comments", "--format", "csv", "--output", str(path),
+        stdout=StringIO(), stderr=stderr
+    )
+    with open(path, encoding="utf-8", newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert len(rows) == 2, (
+        "Убедитесь, что export_blog выгружает комментарии в CSV."
+    )
+    assert "Выгружено строк: 2 " in stderr.getvalue(), (
+        "Убедитесь, что export_blog не считает заголовок CSV выгруженной"
+        " строкой."
+    )
+    assert set(rows[0]) == {"id", "post_id", "author", "text", "created_at"}
+
+
+@pytest.mark.django_db
+def test_export_view_streams_for_staff_only(
+        export_posts, client, user_client, mixer):
+    response = user_client.get("/export/", {"kind": "posts"})
+    assert response.status_code == 302, (
+        "Убедитесь, что выгрузка недоступна пользователям без прав"
+        " персонала."
+    )
+
+    client.force_login(mixer.blend("auth.User", is_staff=True))
+    response = client.get("/export/", {"kind": "posts", "format": "csv"})
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдается через StreamingHttpResponse."
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        body = b"".join(response.streaming_content).decode()
+    assert len(ctx.captured_queries) == 1, (
+        "Убедитесь, что строки выгрузки читаются одним запросом без N+1."
+    )
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert len(rows) == len(export_posts)
+
+    response = client.get("/export/", {"kind": "unknown"})
+    assert response.status_code == 400, (
+        "Убедитесь, что неверные параметры выгрузки дают ответ 400."
+    )
@@ -0,0 +1,47 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    return [q for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_feed_count_is_cached_and_invalidated(
+        mixer, client, user, published_category):
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    assert _count_queries(client, "/")
+    assert not _count_queries(client, "/"), (
+        "Убедитесь, что общее число постов ленты берётся из кэша при"
+        " повторном запросе."
+    )
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    assert _count_queries(client, "/"), (
+        "Убедитесь, что кэш числа постов сбрасывается при сохранении поста."
+    )
+    response = client.get("/")
+    assert response.context["page_obj"].paginator.count == 4
+
+
+@pytest.mark.django_db
+def test_page_window_is_elided(mixer, client, user, published_category):
+    mixer.cycle(200).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    content = client.get("/?page=10").content.decode()
+    assert "?page=20" in content
+    assert "?page=15" not in content, (
+        "Убедитесь, что пагинатор выводит окно номеров страниц, а не все"
+        " страницы подряд."
+    )
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import FeedEntry, Post
+
+
+def _visible_ids(**filters):
+    return set(
+        FeedEntry.objects.visible().filter(**filters).values_list(
+            "post_id", flat=True
+        )
+    )
+
+
+@pytest.fixture
+def feed_posts(mixer):
+    category = mixer.blend("blog.Category", is_published=True)
+    past = timezone.now() - timedelta(days=1)
+    published = mixer.cycle(3).blend(
+        "blog.Post", category=category, is_published=True, pub_date=past
+    )
+    hidden = mixer.blend(
+        "blog.Post", category=category, is_published=False, pub_date=past
+    )
+    return category, published, hidden
+
+
+@pytest.mark.django_db
+def test_feed_entries_follow_posts(feed_posts):
+    category, published, hidden = feed_posts
+    assert _visible_ids() == {post.id for post in published}, (
+        "Убедитесь, что в ленту FeedEntry попадают только опубликованные"
+        " посты опубликованных категорий."
+    )
+
+    hidden.is_published = True
+    hidden.save()
+    post = published[0]
+    post.is_published = False
+    post.save()
+    assert _visible_ids() == {p.id for p in published[1:]} | {hidden.id}, (
+        "Убедитесь, что запись ленты обновляется при сохранении поста."
+    )
+
+    post.delete()
+    assert not FeedEntry.objects.filter(post_id=post.id).exists()
+
+
+@pytest.mark.django_db
+def test_category_toggle_is_one_update(feed_posts):
+    category, published, hidden = feed_posts
+    category.is_published = False
+    with CaptureQueriesContext(connection) as ctx:
+        category.save()
+    updates = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith('UPDATE "blog_feedentry"')
+    ]
+    assert len(updates) == 1, (
+        "Убедитесь, что снятие категории с публикации обновляет ленту"
+        " одним UPDATE."
+    )
+    assert _visible_ids() == set()
+
+    category.is_published = True
+    category.save()
+    assert _visible_ids() == {post.id for post in published}, (
+        "Убедитесь, что после публикации категории в ленту возвращаются"
+        " только опубликованные посты."
+    )
+
+    category.delete()
+    assert _visible_ids() == set(), (
+        "Убедитесь, что посты удалённой категории пропадают из ленты."
+    )
+
+
+@pytest.mark.django_db
+def test_index_reads_feed_entries(feed_posts, client):
+    category, published, hidden = feed_posts
+    response = client.get("/")
+    assert [post.id for post in response.context["page_obj"]] == [
+        post.id for post in sorted(
+            published, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    response = client.get(f"/category/{category.slug}/", {"after": ""})
+    assert {post.id for post in response.context["page_obj"]} == {
+        post.id for post in published
+    }
+
+
+@pytest.mark.django_db
+def test_rebuild_feed(feed_posts):
+    category, published, hidden = feed_posts
+    FeedEntry.objects.all().delete()
+    call_command("rebuild_feed", stdout=StringIO())
+    assert FeedEntry.objects.count() == Post.objects.count()
+    assert _visible_ids(category=category) == {post.id for post in published}
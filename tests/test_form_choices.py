@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.forms import PostForm
+
+
+def _lookup_queries(ctx):
+    return [
+        query["sql"] for query in ctx.captured_queries
+        if '"blog_category"' in query["sql"]
+        or '"blog_location"' in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_create_page_uses_cached_choices(
+        user_client, published_category, published_location):
+    user_client.get("/posts/create/")
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get("/posts/create/")
+    assert not _lookup_queries(ctx), (
+        "Убедитесь, что повторный рендер формы поста не запрашивает"
+        " категории и местоположения из БД."
+    )
+    content = response.content.decode()
+    assert published_category.title in content
+
+
+@pytest.mark.django_db
+def test_cached_choices_follow_publication(
+        published_category, another_category, published_location):
+    data = {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2023-01-01T10:00",
+        "category": published_category.id,
+        "location": published_location.id,
+    }
+    form = PostForm(data=data)
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data["category"].pk == published_category.id
+    with CaptureQueriesContext(connection) as ctx:
+        assert PostForm(data=data).is_valid()
+    assert not _lookup_queries(ctx), (
+        "Убедитесь, что id категории и местоположения проверяются без"
+        " запросов к БД."
+    )
+
+    published_category.is_published = False
+    published_category.save()
+    form = PostForm(data=data)
+    assert not form.is_valid() and "category" in form.errors, (
+        "Убедитесь, что снятая с публикации категория сразу пропадает из"
+        " допустимых вариантов."
+    )
+    choices = [value for value, _ in form.fields["category"].choices]
+    assert choices == [another_category.id]
+
+    form = PostForm(data={**data, "category": "не число"})
+    assert not form.is_valid() and "category" in form.errors
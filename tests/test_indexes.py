@@ -0,0 +1,79 @@
+import re
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Comment, FeedEntry, Location, Post
+
+
+def _query_plan(queryset) -> str:
+    with connection.cursor() as cursor:
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return "\n".join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="план запроса проверяется в SQLite"
+)
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "make_queryset, index_name",
+    [
+        (
+            lambda now: Post.objects.filter(
+                is_published=True,
+                pub_date__lte=now,
+                category__is_published=True,
+            ).select_related("author", "category", "location"),
+            "post_",
+        ),
+        (
+            lambda now: Post.objects.filter(
+                category_id=1, is_published=True, pub_date__lte=now
+            ),
+            "post_category_pub_date_idx",
+        ),
+        (
+            lambda now: Post.objects.filter(
+                author_id=1, is_published=True, pub_date__lte=now
+            ),
+            "post_author_pub_date_idx",
+        ),
+        (
+            lambda now: Comment.objects.filter(post_id=1),
+            "comment_post_created_idx",
+        ),
+        (
+            lambda now: FeedEntry.objects.filter(
+                is_visible=True, pub_date__lte=now
+            ).order_by("-pub_date", "-post_id").select_related("post"),
+            "feed_visible_pub_date_idx",
+        ),
+        (
+            lambda now: FeedEntry.objects.filter(
+                category_id=1, is_visible=True, pub_date__lte=now
+            ).order_by("-pub_date", "-post_id").select_related("post"),
+            "feed_category_pub_date_idx",
+        ),
+        (
+            lambda now: Location.objects.autocomplete("моск"),
+            "location_name_normalized_idx",
+        ),
+    ],
+)
+def test_feed_queries_use_indexes(make_queryset, index_name):
+    plan = _query_plan(make_queryset(timezone.now())[:10])
+    assert re.search(rf"USING (COVERING )?INDEX {index_name}", plan), (
+        f"Убедитесь, что запрос использует индекс `{index_name}`. План"
+        f" запроса:\n{plan}"
+    )
+    for table in (
+        "blog_post", "blog_comment", "blog_feedentry", "blog_location"
+    ):
+        full_scan = re.search(rf"SCAN (TABLE )?{table}$", plan, re.M)
+        assert not full_scan, (
+            f"Убедитесь, что запрос не читает таблицу `{table}` целиком."
+            f" План запроса:\n{plan}"
+        )
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары постов с одинаковой датой проверяют разбор ничьих по id
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+@pytest.mark.django_db
+def test_keyset_pages_cover_feed(client, many_posts):
+    seen = []
+    url = "/?after="
+    for _ in range(len(many_posts)):
+        response = client.get(url)
+        page_obj = response.context["page_obj"]
+        seen.extend(page_obj)
+        if not page_obj.has_next():
+            break
+        assert f"?after={page_obj.next_cursor}" in response.content.decode(), (
+            "Убедитесь, что в пагинаторе выводится ссылка на следующую"
+            " страницу с курсором."
+        )
+        url = f"/?after={page_obj.next_cursor}"
+
+    expected = sorted(
+        many_posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    assert [post.id for post in seen] == [post.id for post in expected], (
+        "Убедитесь, что keyset-пагинация выдаёт все посты ленты ровно один"
+        " раз и в порядке убывания (pub_date, id)."
+    )
+
+
+@pytest.mark.django_db
+def test_keyset_broken_cursor_is_first_page(client, many_posts):
+    first = client.get("/?after=").context["page_obj"]
+    broken = client.get("/?after=not-a-cursor").context["page_obj"]
+    assert [post.id for post in broken] == [post.id for post in first]
+    assert len(first) == N_PER_PAGE
@@ -0,0 +1,81 @@
+import pytest
+
+from blog.models import Location
+
+
+def _names(response):
+    return [item["name"] for item in response.json()["results"]]
+
+
+@pytest.fixture
+def locations(mixer):
+    names = ["Москва", "Мурманск", "Ёлкино", "Елабуга", "Минск"]
+    return {
+        name: mixer.blend("blog.Location", name=name, is_published=True)
+        for name in names
+    }
+
+
+@pytest.mark.django_db
+def test_autocomplete_matches_prefix(client, mixer, locations):
+    mixer.blend("blog.Location", name="Мытищи", is_published=False)
+    response = client.get("/locations/autocomplete/", {"q": "  м "})
+    assert _names(response) == ["Минск", "Москва", "Мурманск"], (
+        "Убедитесь, что автодополнение возвращает опубликованные"
+        " местоположения с введенным префиксом в алфавитном порядке."
+    )
+    assert _names(client.get(
+        "/locations/autocomplete/", {"q": "ЕЛ"}
+    )) == ["Елабуга", "Ёлкино"], (
+        "Убедитесь, что префикс ищется без учета регистра и различия"
+        " букв ё и е."
+    )
+    assert _names(client.get("/locations/autocomplete/", {"q": ""})) == []
+    item = client.get("/locations/autocomplete/", {"q": "мос"}).json()
+    assert item["results"] == [
+        {"id": locations["Москва"].id, "name": "Москва"}
+    ]
+
+
+@pytest.mark.django_db
+def test_autocomplete_limit(client, mixer, settings):
+    settings.BLOG_LOCATION_AUTOCOMPLETE_LIMIT = 3
+    mixer.cycle(5).blend(
+        "blog.Location", name=mixer.sequence("Город {0}"), is_published=True
+    )
+    assert len(_names(
+        client.get("/locations/autocomplete/", {"q": "город"})
+    )) == 3
+
+
+@pytest.mark.django_db
+def test_name_normalized_follows_name(mixer):
+    location = mixer.blend("blog.Location", name="Санкт  Петербург")
+    assert location.name_normalized == "санкт петербург"
+    location.name = "Пётр"
+    location.save()
+    location.refresh_from_db()
+    assert location.name_normalized == "петр"
+    Location.objects.bulk_create([Location(name="Ёжиково")])
+    assert Location.objects.get(name="Ёжиково").name_normalized == "ежиково"
+
+
+@pytest.mark.django_db
+def test_create_page_renders_selected_location_only(
+        user_client, mixer, user, locations):
+    content = user_client.get("/posts/create/").content.decode()
+    assert "data-autocomplete-url" in content
+    assert "js/location_autocomplete.js" in content
+    assert not any(name in content for name in locations), (
+        "Убедитесь, что форма поста не выводит все местоположения"
+        " списком: варианты подгружаются автодополнением."
+    )
+    post = mixer.blend(
+        "blog.Post", author=user, location=locations["Минск"]
+    )
+    content = user_client.get(f"/posts/{post.id}/edit/").content.decode()
+    assert "Минск" in content, (
+        "Убедитесь, что при редактировании поста выбранное"
+        " местоположение остается в поле."
+    )
+    assert "Москва" not in content
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pytest
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+
+@pytest.fixture(autouse=True)
+def page_cache_enabled():
+    with override_settings(BLOG_PAGE_CACHE_TIMEOUT=300):
+        yield
+
+
+@pytest.mark.django_db
+def test_anonymous_page_is_cached_and_invalidated(
+        mixer, client, post_with_published_location):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    category_url = f"/category/{post.category.slug}/"
+    for url in ("/", detail_url, category_url):
+        assert client.get(url).context is not None
+        assert client.get(url).context is None, (
+            f"Убедитесь, что страница `{url}` для анонимного пользователя"
+            " отдаётся из кэша."
+        )
+
+    mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    for url in ("/", detail_url, category_url):
+        assert client.get(url).context is not None, (
+            f"Убедитесь, что кэш страницы `{url}` сбрасывается при"
+            " добавлении комментария."
+        )
+    assert "Свежий комментарий" in client.get(detail_url).content.decode()
+
+
+@pytest.mark.django_db
+def test_page_cache_skips_authenticated_users(
+        user_client, post_with_published_location):
+    user_client.get("/")
+    assert user_client.get("/").context is not None
+
+
+@pytest.mark.django_db
+def test_page_cache_expires_at_next_publication(
+        mixer, client, user, published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(seconds=1),
+    )
+    client.get("/")
+    assert client.get("/").context is not None, (
+        "Убедитесь, что страница не кэшируется дольше, чем до ближайшей"
+        " отложенной публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_page_cached_before_commit_is_not_served(
+        mixer, client, django_capture_on_commit_callbacks,
+        post_with_published_location):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            mixer.blend("blog.Comment", post=post)
+            # Параллельный читатель кэширует страницу до фиксации записи
+            client.get(detail_url)
+            assert client.get(detail_url).context is None
+    assert client.get(detail_url).context is not None, (
+        "Убедитесь, что метки версий сбрасываются еще раз после фиксации"
+        " транзакции: страница, закэшированная до нее, могла быть"
+        " построена по старым данным."
+    )
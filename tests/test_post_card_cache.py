@@ -0,0 +1,61 @@
+import pytest
+from django.db import transaction
+
+from blog import caching
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_post_card_cache_hits_and_invalidation(
+        monkeypatch, client, post_with_published_location):
+    post = post_with_published_location
+    rendered = []
+    render = caching.render_to_string
+
+    def counting_render(template_name, context):
+        rendered.append(context["post"].id)
+        return render(template_name, context)
+
+    monkeypatch.setattr(caching, "render_to_string", counting_render)
+
+    client.get("/")
+    client.get("/")
+    assert rendered == [post.id], (
+        "Убедитесь, что карточка поста берётся из кэша при повторном"
+        " рендере ленты."
+    )
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    content = client.get("/").content.decode()
+    assert "Новое название категории" in content, (
+        "Убедитесь, что карточка поста сбрасывается при изменении категории."
+    )
+
+    post.author.username = "renamed_author"
+    post.author.save()
+    content = client.get("/").content.decode()
+    assert "@renamed_author" in content, (
+        "Убедитесь, что карточка поста сбрасывается при смене имени автора."
+    )
+    assert rendered == [post.id] * 3
+
+
+@pytest.mark.django_db
+def test_card_rendered_before_commit_is_not_served(
+        django_capture_on_commit_callbacks, post_with_published_location):
+    post = post_with_published_location
+    stale = Post.objects.with_feed_relations().get(pk=post.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            post.location.name = "Переименованное место"
+            post.location.save()
+            # Параллельный запрос видит данные до фиксации и кэширует
+            # карточку под уже новой меткой местоположения
+            caching.render_post_cards([stale])
+    fresh = Post.objects.with_feed_relations().get(pk=post.pk)
+    caching.render_post_cards([fresh])
+    assert "Переименованное место" in fresh.card_html, (
+        "Убедитесь, что карточка, закэшированная до фиксации транзакции,"
+        " не отдается после нее."
+    )
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.fixture
+def visibility_posts(mixer, user):
+    past = timezone.now() - timedelta(days=1)
+    future = timezone.now() + timedelta(days=1)
+    category = mixer.blend("blog.Category", is_published=True)
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    location = mixer.blend("blog.Location", is_published=True)
+
+    def post(**fields):
+        return mixer.blend("blog.Post", **{
+            "author": user, "category": category, "location": location,
+            "is_published": True, "pub_date": past, **fields
+        })
+
+    return {
+        "visible": post(),
+        "scheduled": post(pub_date=future),
+        "unpublished": post(is_published=False),
+        "hidden_category": post(category=hidden_category),
+    }
+
+
+@pytest.mark.django_db
+def test_published_filters_hidden_posts(visibility_posts):
+    visible_ids = set(Post.objects.published().values_list("id", flat=True))
+    assert visible_ids == {visibility_posts["visible"].id}, (
+        "Убедитесь, что `Post.objects.published()` исключает отложенные"
+        " посты, снятые с публикации и посты неопубликованных категорий."
+    )
+    for name, post in visibility_posts.items():
+        loaded = Post.objects.with_feed_relations().get(pk=post.pk)
+        assert loaded.is_visible() == (name == "visible"), (
+            "Убедитесь, что `Post.is_visible()` совпадает с условием"
+            f" `published()` для поста `{name}`."
+        )
+
+
+@pytest.mark.django_db
+def test_author_sees_own_hidden_posts(
+        visibility_posts, user, user_client, another_user_client):
+    url = f"/profile/{user.username}/"
+    own = user_client.get(url).context["page_obj"]
+    assert {post.id for post in own} == {
+        post.id for post in visibility_posts.values()
+    }, (
+        "Убедитесь, что автор видит в профиле все свои посты, включая"
+        " отложенные и скрытые."
+    )
+    foreign = another_user_client.get(url).context["page_obj"]
+    assert {post.id for post in foreign} == {
+        visibility_posts["visible"].id
+    }, (
+        "Убедитесь, что другие пользователи видят в профиле только"
+        " опубликованные посты автора."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_relations_load_in_one_query(mixer, visibility_posts):
+    mixer.cycle(3).blend(
+        "blog.Comment", post=visibility_posts["visible"]
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        posts = list(Post.objects.with_feed_relations())
+        for post in posts:
+            (post.author.username, post.category.title, post.location.name,
+             post.comment_count)
+    assert len(ctx.captured_queries) == 1, (
+        "Убедитесь, что `with_feed_relations()` загружает автора, категорию"
+        " и местоположение одним запросом вместе с постами, а число"
+        " комментариев берется из сохранённого счётчика."
+    )
+    live = Post.objects.with_live_comment_counts().get(
+        pk=visibility_posts["visible"].pk
+    )
+    assert live.live_comment_count == live.comment_count == 3, (
+        "Убедитесь, что `with_live_comment_counts()` считает"
+        " комментарии и совпадает с сохранённым счётчиком."
+    )
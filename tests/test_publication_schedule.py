@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import tasks
+from blog.caching import (
+    feed_count_key, feed_valid_until, get_cache, get_versions
+)
+from blog.models import Post, Task
+
+
+@pytest.fixture
+def future_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1)
+    )
+
+
+def _publication_tasks():
+    return Task.objects.filter(name="blog.publish_post")
+
+
+@pytest.mark.django_db
+def test_future_post_schedules_publication(future_post):
+    queued = _publication_tasks().get()
+    assert queued.run_after == future_post.pub_date, (
+        "Убедитесь, что событие публикации запланировано на pub_date"
+        " отложенного поста."
+    )
+    assert queued.payload == {"post_id": future_post.id}
+
+    future_post.title = "Другой заголовок"
+    future_post.save()
+    assert _publication_tasks().count() == 1, (
+        "Убедитесь, что пересохранение поста без смены даты не планирует"
+        " событие повторно."
+    )
+    future_post.pub_date += timedelta(hours=1)
+    future_post.save()
+    assert _publication_tasks().count() == 2
+
+
+@pytest.mark.django_db
+def test_feed_valid_until_is_cached(future_post, mixer, user):
+    assert feed_valid_until() == future_post.pub_date
+    with CaptureQueriesContext(connection) as ctx:
+        assert feed_valid_until() == future_post.pub_date
+    assert not ctx.captured_queries, (
+        "Убедитесь, что момент ближайшей публикации берётся из кэша."
+    )
+
+    sooner = mixer.blend(
+        "blog.Post", author=user, category=future_post.category,
+        is_published=True, pub_date=timezone.now() + timedelta(minutes=5)
+    )
+    assert feed_valid_until() == sooner.pub_date, (
+        "Убедитесь, что сохранение поста сбрасывает момент ближайшей"
+        " публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_publish_post_event_refreshes_feeds(future_post):
+    cache = get_cache()
+    cache.set(feed_count_key("index"), 0)
+    index_version = get_versions("feed:index")["feed:index"]
+    # Наступление даты публикации без сохранения поста
+    past = timezone.now() - timedelta(seconds=1)
+    Post.objects.filter(pk=future_post.pk).update(pub_date=past)
+    future_post.feed_entry.pub_date = past
+    future_post.feed_entry.save()
+
+    tasks.publish_post(future_post.id)
+    assert cache.get(feed_count_key("index")) == 1, (
+        "Убедитесь, что событие публикации пересчитывает счётчик ленты."
+    )
+    assert get_versions("feed:index")["feed:index"] != index_version, (
+        "Убедитесь, что событие публикации сбрасывает кэш страниц ленты."
+    )
+    assert feed_valid_until() is None
@@ -0,0 +1,136 @@
+import pytest
+from django.db import connections, router
+from django.test.utils import CaptureQueriesContext
+
+from blog import caching
+from blog.caching import render_post_cards
+from blog.models import Category
+from blog.routers import PRIMARY_COOKIE, _read_database
+
+DATABASES = ["default", "replica"]
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.BLOG_READ_REPLICAS = ["replica"]
+    settings.BLOG_PRIMARY_STICKY_SECONDS = 5
+
+
+def _queries(client, url, method="get", **kwargs):
+    with CaptureQueriesContext(connections["default"]) as primary, \
+            CaptureQueriesContext(connections["replica"]) as replica:
+        response = getattr(client, method)(url, **kwargs)
+    return response, len(primary), len(replica)
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_feeds_read_from_replica(replicas, client, mixer):
+    category = mixer.blend("blog.Category", is_published=True)
+    mixer.blend("blog.Post", category=category, is_published=True)
+    for url in ("/", f"/category/{category.slug}/", "/search/?q=пост"):
+        response, primary, replica = _queries(client, url)
+        assert response.status_code in (200, 404)
+        assert replica and not primary, (
+            f"Убедитесь, что страница `{url}` читает данные из реплики,"
+            " а не из основной БД."
+        )
+    # В реплике категории нет: страница берется из реплики, а не из
+    # основной БД, где категория уже создана
+    assert client.get(f"/category/{category.slug}/").status_code == 404
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_writer_sticks_to_primary(
+        replicas, user_client, post_with_published_location):
+    post = post_with_published_location
+    response, _, replica = _queries(
+        user_client, f"/posts/{post.id}/comment/", method="post",
+        data={"text": "Комментарий"}
+    )
+    assert response.status_code == 302 and not replica
+    assert PRIMARY_COOKIE in response.cookies, (
+        "Убедитесь, что после записи пользователю ставится cookie,"
+        " закрепляющий его за основной БД."
+    )
+    assert response.cookies[PRIMARY_COOKIE]["max-age"] == 5
+
+    response, primary, replica = _queries(user_client, f"/posts/{post.id}/")
+    assert response.status_code == 200 and primary and not replica, (
+        "Убедитесь, что сразу после записи пользователь читает из"
+        " основной БД и видит свой комментарий."
+    )
+    assert "Комментарий" in response.content.decode()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_sticky_cookie_expires(replicas, client):
+    client.cookies[PRIMARY_COOKIE] = "1"  # Момент давно в прошлом
+    _, primary, replica = _queries(client, "/")
+    assert replica and not primary
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_writes_go_to_primary(replicas, mixer):
+    category = Category(title="Реплика", slug="replica", description="-")
+    category.save(using="replica")
+    loaded = Category.objects.using("replica").get(slug="replica")
+    assert router.db_for_write(Category, instance=loaded) == "default", (
+        "Убедитесь, что объект, прочитанный из реплики, сохраняется"
+        " в основную БД."
+    )
+    assert router.allow_relation(loaded, mixer.blend("blog.Post"))
+
+
+@pytest.mark.django_db
+def test_without_replicas_reads_primary(user_client, mixer):
+    response = user_client.post("/auth/login/")
+    assert PRIMARY_COOKIE not in response.cookies
+    category = mixer.blend("blog.Category", is_published=True)
+    assert user_client.get(f"/category/{category.slug}/").status_code == 200
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_lagging_replica_is_not_cached(replicas, settings, client, mixer):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 60
+    category = mixer.blend("blog.Category", is_published=True)
+    mixer.blend(
+        "blog.Post", category=category, is_published=True,
+        title="Свежий пост"
+    )
+    # Реплика еще не получила пост, а метки версий уже сброшены
+    response = client.get("/")
+    assert "Свежий пост" not in response.content.decode()
+
+    settings.BLOG_READ_REPLICAS = []  # Реплика догнала основную БД
+    assert "Свежий пост" in client.get("/").content.decode(), (
+        "Убедитесь, что страница, прочитанная с отстающей реплики, не"
+        " кэшируется под новыми метками версий."
+    )
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_lagging_replica_post_cards_are_not_cached(
+        replicas, settings, monkeypatch, mixer):
+    post = mixer.blend("blog.Post", title="Новый заголовок")
+    rendered = []
+    monkeypatch.setattr(
+        caching, "render_to_string",
+        lambda *args, **kwargs: rendered.append(args) or "карточка"
+    )
+    token = _read_database.set("replica")
+    try:
+        render_post_cards([post])
+        render_post_cards([post])
+        assert len(rendered) == 2, (
+            "Убедитесь, что карточки, отрендеренные с реплики сразу после"
+            " записи, не попадают в кэш."
+        )
+        settings.BLOG_PRIMARY_STICKY_SECONDS = 0
+        render_post_cards([post])
+        render_post_cards([post])
+        assert len(rendered) == 3, (
+            "Убедитесь, что после допустимого отставания реплики"
+            " карточки снова кэшируются."
+        )
+    finally:
+        _read_database.reset(token)
@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.search import get_search_backend, search_posts
+
+BACKENDS = ["fts5", "python"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    with override_settings(BLOG_SEARCH_BACKEND=request.param):
+        yield request.param
+
+
+@pytest.fixture
+def published_category(mixer):
+    return mixer.blend("blog.Category", is_published=True)
+
+
+def _post(mixer, category, **kwargs):
+    defaults = {
+        "category": category,
+        "is_published": True,
+        "pub_date": timezone.now() - timedelta(days=1),
+        "title": "Заметка",
+        "text": "Обычный текст",
+    }
+    defaults.update(kwargs)
+    return mixer.blend("blog.Post", **defaults)
+
+
+def _ids(page):
+    return [post.id for post in page]
+
+
+@pytest.mark.django_db
+def test_search_respects_visibility(backend, mixer, published_category):
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    visible = _post(mixer, published_category, text="Прогулка по набережной")
+    _post(mixer, published_category, text="Набережная", is_published=False)
+    _post(
+        mixer, published_category, text="Набережная",
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    _post(mixer, hidden_category, text="Набережная")
+
+    assert _ids(search_posts("набережной")) == [visible.id], (
+        "Убедитесь, что поиск находит только посты, видимые на главной"
+        f" (бэкенд {backend})."
+    )
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_and_highlights(
+        backend, mixer, published_category):
+    in_text = _post(
+        mixer, published_category, text="Вечером видели <b>Марс</b>"
+    )
+    in_title = _post(
+        mixer, published_category, title="Марс", text="Красная планета"
+    )
+
+    page = search_posts("марс")
+    assert _ids(page) == [in_title.id, in_text.id], (
+        "Убедитесь, что совпадение в заголовке ранжируется выше"
+        f" (бэкенд {backend})."
+    )
+    snippet = page[1].search_snippet
+    assert "<mark>" in snippet and "<b>" not in snippet, (
+        "Убедитесь, что сниппет подсвечивает найденные слова и экранирует"
+        " HTML текста поста."
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_edits(backend, mixer, published_category):
+    post = _post(mixer, published_category, text="Старый текст про лося")
+    assert _ids(search_posts("лося")) == [post.id]
+
+    post.text = "Новый текст про зубра"
+    post.save()
+    assert _ids(search_posts("лося")) == [], (
+        "Убедитесь, что индекс обновляется при изменении поста."
+    )
+    assert _ids(search_posts("зубра")) == [post.id]
+
+    post.delete()
+    assert _ids(search_posts("зубра")) == [], (
+        "Убедитесь, что удалённый пост пропадает из индекса."
+    )
+
+
+@pytest.mark.django_db
+def test_search_treats_yo_as_ye(backend, mixer, published_category):
+    post = _post(
+        mixer, published_category, title="Ёлка", text="Ещё зелёная ёлка"
+    )
+    for rebuilt in (False, True):
+        if rebuilt:
+            get_search_backend().rebuild()
+        for query in ("ёлка", "елка", "зеленая", "ЗЕЛЁНАЯ"):
+            assert _ids(search_posts(query)) == [post.id], (
+                "Убедитесь, что поиск не различает ё и е в тексте поста"
+                f" и запросе `{query}` (бэкенд {backend},"
+                f" {'после' if rebuilt else 'до'} перестроения индекса)."
+            )
+    snippet = search_posts("елка")[0].search_snippet
+    assert "<mark>ёлка</mark>" in snippet, (
+        "Убедитесь, что сниппет показывает слово в написании поста."
+    )
+
+
+@pytest.mark.django_db
+def test_search_keyset_pagination(backend, mixer, published_category):
+    posts = [
+        _post(mixer, published_category, text=f"Маяк номер {index}")
+        for index in range(13)
+    ]
+    first = search_posts("маяк", per_page=10)
+    assert len(first) == 10 and first.has_next()
+    second = search_posts("маяк", cursor=first.next_cursor, per_page=10)
+    assert not second.has_next()
+    assert sorted(_ids(first) + _ids(second)) == sorted(
+        post.id for post in posts
+    ), "Убедитесь, что страницы выдачи не пересекаются и ничего не теряют."
+
+
+@pytest.mark.django_db
+def test_search_view(backend, client, mixer, published_category):
+    post = _post(mixer, published_category, text="Поход на байдарках")
+    response = client.get("/search/", {"q": 'байдарках OR NEAR("*'})
+    assert response.status_code == 200, (
+        "Убедитесь, что синтаксис FTS5 во вводе пользователя не ломает"
+        " поиск."
+    )
+    response = client.get("/search/", {"q": "байдарках"})
+    assert post.title in response.content.decode()
+    assert "<mark>байдарках</mark>" in response.content.decode()
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_SEARCH_BACKEND="python")
+def test_term_search_caches_post_total(mixer, published_category):
+    _post(mixer, published_category, text="Утренний туман")
+    assert len(search_posts("туман")) == 1
+    with CaptureQueriesContext(connection) as ctx:
+        search_posts("туман")
+    assert not any(
+        "COUNT(*)" in query["sql"] and '"blog_post"' in query["sql"]
+        and '"blog_postsearchterm"' not in query["sql"]
+        for query in ctx.captured_queries
+    ), (
+        "Убедитесь, что число всех постов для IDF не считается заново"
+        " при каждом поиске."
+    )
+    second = _post(mixer, published_category, text="Вечерний туман")
+    assert second.id in [post.id for post in search_posts("туман")], (
+        "Убедитесь, что новый пост сбрасывает закэшированное число постов."
+    )
@@ -0,0 +1,79 @@
+import importlib
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.exceptions import ImproperlyConfigured
+
+PROD_ENV = {
+    "BLOGICUM_SECRET_KEY": "prod-secret",
+    "BLOGICUM_ALLOWED_HOSTS": "blogicum.example, www.blogicum.example",
+}
+
+
+@pytest.fixture
+def load_settings(monkeypatch):
+    """Заново выполняет модуль настроек с заданным окружением."""
+
+    for name in ("BLOGICUM_ENV", *PROD_ENV):
+        monkeypatch.delenv(name, raising=False)
+    loaded = []
+
+    def load(module, **environ):
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        loaded.append(module)
+        return importlib.reload(importlib.import_module(module))
+
+    yield load
+    # Пакет настроек возвращается к профилю окружения тестов
+    monkeypatch.undo()
+    if "blogicum.settings" in loaded:
+        importlib.reload(importlib.import_module("blogicum.settings"))
+
+
+def test_default_profile_is_dev(load_settings):
+    settings = load_settings("blogicum.settings")
+    assert settings.DEBUG is True
+    assert settings.BASE_DIR == django_settings.BASE_DIR
+    assert settings.BASE_DIR.joinpath("manage.py").exists(), (
+        "Убедитесь, что BASE_DIR по-прежнему указывает на каталог"
+        " с manage.py."
+    )
+
+
+def test_prod_profile(load_settings):
+    settings = load_settings(
+        "blogicum.settings", BLOGICUM_ENV="prod",
+        BLOGICUM_CONN_MAX_AGE="120", **PROD_ENV
+    )
+    assert settings.DEBUG is False
+    assert settings.SECRET_KEY == "prod-secret"
+    assert settings.ALLOWED_HOSTS == [
+        "blogicum.example", "www.blogicum.example"
+    ]
+    assert settings.DATABASES["default"]["CONN_MAX_AGE"] == 120, (
+        "Убедитесь, что в продакшене соединения с БД переиспользуются."
+    )
+    assert "LocMemCache" not in settings.CACHES["default"]["BACKEND"]
+    assert settings.SESSION_ENGINE.endswith("cached_db")
+    assert settings.STATICFILES_STORAGE.endswith(
+        "ManifestStaticFilesStorage"
+    )
+    assert settings.BLOG_PAGE_CACHE_TIMEOUT > 0
+    assert django_settings.DATABASES["default"]["CONN_MAX_AGE"] == 0, (
+        "Убедитесь, что профиль prod не меняет словари профиля dev."
+    )
+
+
+@pytest.mark.parametrize("missing", list(PROD_ENV))
+def test_prod_requires_secrets(load_settings, missing):
+    environ = {
+        name: value for name, value in PROD_ENV.items() if name != missing
+    }
+    with pytest.raises(ImproperlyConfigured, match=missing):
+        load_settings("blogicum.settings.prod", **environ)
+
+
+def test_unknown_profile(load_settings):
+    with pytest.raises(ImproperlyConfigured):
+        load_settings("blogicum.settings", BLOGICUM_ENV="staging")
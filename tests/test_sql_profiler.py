@@ -0,0 +1,41 @@
+import logging
+
+import pytest
+from django.test import Client, override_settings
+
+from blog.middleware import normalize_sql
+
+
+def test_normalize_sql_merges_parameters():
+    assert normalize_sql(
+        "SELECT * FROM blog_post WHERE id = 5 AND title = 'x'"
+    ) == normalize_sql(
+        "SELECT *  FROM blog_post\nWHERE id = 7 AND title = 'it''s'"
+    )
+    assert normalize_sql(
+        'SELECT * FROM t WHERE id IN (%s, %s, %s)'
+    ) == "SELECT * FROM t WHERE id IN (...)"
+
+
+@pytest.mark.django_db
+@override_settings(
+    SQL_PROFILER_ENABLED=True, SQL_PROFILER_N_PLUS_ONE_THRESHOLD=0
+)
+def test_profiler_header_and_log(caplog, post_with_published_location):
+    with caplog.at_level(logging.WARNING, logger="blog.sql"):
+        response = Client().get("/")
+    assert response["X-SQL-Profile"].startswith("queries="), (
+        "Убедитесь, что профилировщик SQL добавляет заголовок"
+        " `X-SQL-Profile`."
+    )
+    records = [r for r in caplog.records if r.name == "blog.sql"]
+    assert records and records[0].sql_profile["view"] == "blog:index"
+    assert records[0].sql_profile["n_plus_one"], (
+        "Убедитесь, что повторяющиеся запросы помечаются как N+1."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(SQL_PROFILER_ENABLED=False)
+def test_profiler_can_be_disabled():
+    assert "X-SQL-Profile" not in Client().get("/pages/about/")
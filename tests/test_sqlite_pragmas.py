@@ -0,0 +1,82 @@
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from blog.database import sqlite_pragma_statements
+
+
+def _file_connection(path):
+    settings_dict = {
+        **connection.settings_dict,
+        "NAME": str(path),
+        "TEST": {},
+    }
+    return DatabaseWrapper(settings_dict, alias="pragma_test")
+
+
+def _pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="PRAGMA есть только в SQLite"
+)
+@pytest.mark.django_db
+def test_pragmas_applied_on_connect(tmp_path, settings):
+    settings.BLOG_SQLITE_PRAGMAS = {
+        "busy_timeout": 3000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 1048576,
+        "cache_size": -2048,
+    }
+    wrapper = _file_connection(tmp_path / "pragmas.sqlite3")
+    try:
+        assert _pragma(wrapper, "journal_mode") == "wal", (
+            "Убедитесь, что новое соединение с SQLite переводится в режим"
+            " WAL."
+        )
+        assert _pragma(wrapper, "synchronous") == 1  # NORMAL
+        assert _pragma(wrapper, "busy_timeout") == 3000
+        assert _pragma(wrapper, "mmap_size") == 1048576
+        assert _pragma(wrapper, "cache_size") == -2048
+    finally:
+        wrapper.close()
+
+
+def test_pragma_settings_are_validated():
+    assert sqlite_pragma_statements({"synchronous": "NORMAL"}) == [
+        "PRAGMA synchronous = NORMAL"
+    ]
+    for pragmas in (
+        {"writable_schema": 1},
+        {"journal_mode": "WAL; DROP TABLE blog_post"},
+    ):
+        with pytest.raises(ImproperlyConfigured):
+            sqlite_pragma_statements(pragmas)
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="бенчмарк только для SQLite"
+)
+def test_benchmark_sqlite_command():
+    result = subprocess.run(
+        [
+            sys.executable, "manage.py", "benchmark_sqlite",
+            "--duration", "0.3", "--writers", "2", "--readers", "2",
+        ],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["off", "on"], (
+        "Убедитесь, что команда `benchmark_sqlite` сравнивает прогоны без"
+        " PRAGMA и с ними."
+    )
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.test import override_settings
+from django.utils import timezone
+
+from blog import tasks
+from blog.models import Task
+
+
+@pytest.fixture
+def flaky_task():
+    calls = []
+
+    @tasks.task("tests.flaky", max_attempts=2)
+    def flaky(fail):
+        calls.append(fail)
+        if fail:
+            raise RuntimeError("сбой")
+
+    yield calls
+    tasks._registry.pop("tests.flaky")
+
+
+def run_queued_tasks():
+    for queued in tasks.claim_tasks(limit=100):
+        tasks.run_task(queued)
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_TASKS_RETRY_DELAY=0)
+def test_task_retries_then_fails(flaky_task):
+    queued = tasks.enqueue("tests.flaky", fail=True)
+    run_queued_tasks()
+    queued.refresh_from_db()
+    assert queued.status == Task.PENDING and queued.attempts == 1, (
+        "Убедитесь, что упавшая задача возвращается в очередь для повтора."
+    )
+    run_queued_tasks()
+    queued.refresh_from_db()
+    assert queued.status == Task.FAILED and "сбой" in queued.last_error
+    assert flaky_task == [True, True]
+
+
+@pytest.mark.django_db
+def test_task_is_claimed_once(flaky_task):
+    tasks.enqueue("tests.flaky", fail=False)
+    claimed = tasks.claim_tasks(limit=10)
+    assert len(claimed) == 1
+    assert tasks.claim_tasks(limit=10) == []
+
+
+@pytest.mark.django_db
+@override_settings(
+    EMAIL_BACKEND="blog.mail.QueuedEmailBackend",
+    BLOG_TASKS_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+def test_email_is_sent_by_worker(client, user):
+    user.email = "reader@example.com"
+    user.save()
+    client.post("/auth/password_reset/", {"email": user.email})
+    assert not mail.outbox, (
+        "Убедитесь, что письмо сброса пароля не отправляется в потоке"
+        " запроса."
+    )
+    run_queued_tasks()
+    assert [message.to for message in mail.outbox] == [[user.email]]
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_TASKS_LEASE=60)
+def test_abandoned_task_is_reclaimed(flaky_task):
+    queued = tasks.enqueue("tests.flaky", fail=False)
+    assert tasks.claim_tasks(limit=10)
+    # Обработчик упал, не завершив задачу: аренда истекает
+    Task.objects.filter(pk=queued.pk).update(
+        claimed_at=timezone.now() - timedelta(minutes=5)
+    )
+    reclaimed = tasks.claim_tasks(limit=10)
+    assert [task.pk for task in reclaimed] == [queued.pk], (
+        "Убедитесь, что задача, брошенная упавшим обработчиком, снова"
+        " забирается из очереди после истечения BLOG_TASKS_LEASE."
+    )
+    assert reclaimed[0].attempts == 2
+
+    Task.objects.filter(pk=queued.pk).update(
+        claimed_at=timezone.now() - timedelta(minutes=5)
+    )
+    assert tasks.claim_tasks(limit=10) == []
+    queued.refresh_from_db()
+    assert queued.status == Task.FAILED, (
+        "Убедитесь, что брошенная задача без оставшихся попыток"
+        " помечается как FAILED."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(
+    EMAIL_BACKEND="blog.mail.QueuedEmailBackend",
+    BLOG_TASKS_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+def test_queued_email_keeps_headers_and_rejects_attachments():
+    mail.EmailMessage(
+        "Тема", "Текст", "from@example.com", ["to@example.com"],
+        headers={"X-Blogicum": "1"},
+    ).send()
+    run_queued_tasks()
+    assert mail.outbox[0].extra_headers == {"X-Blogicum": "1"}, (
+        "Убедитесь, что QueuedEmailBackend передает заголовки письма."
+    )
+    message = mail.EmailMessage(
+        "Тема", "Текст", "from@example.com", ["to@example.com"]
+    )
+    message.attach("file.txt", "содержимое", "text/plain")
+    with pytest.raises(ValueError):
+        message.send()
+    assert not Task.objects.filter(status=Task.PENDING).exists(), (
+        "Убедитесь, что письмо с вложениями не ставится в очередь без них."
+    )
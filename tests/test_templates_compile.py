@@ -0,0 +1,54 @@
+import importlib
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.template import engines
+from django.test import override_settings
+
+from blog.templating import warm_templates
+
+
+def test_compile_templates_command():
+    stdout = StringIO()
+    call_command("compile_templates", stdout=stdout)
+    assert "Шаблоны скомпилированы" in stdout.getvalue(), (
+        "Убедитесь, что команда `compile_templates` компилирует все"
+        " шаблоны проекта без ошибок."
+    )
+
+
+def test_compile_templates_reports_errors(tmp_path, settings):
+    (tmp_path / "ok.html").write_text("{{ value }}", encoding="utf-8")
+    (tmp_path / "broken.html").write_text(
+        "{% if value %}не закрыт", encoding="utf-8"
+    )
+    templates = [{**settings.TEMPLATES[0], "DIRS": [tmp_path]}]
+    stderr = StringIO()
+    with override_settings(TEMPLATES=templates):
+        with pytest.raises(CommandError):
+            call_command("compile_templates", stderr=stderr)
+    assert "broken.html" in stderr.getvalue(), (
+        "Убедитесь, что команда `compile_templates` называет шаблон"
+        " с ошибкой."
+    )
+
+
+def test_prod_templates_are_cached_and_warmed(monkeypatch):
+    monkeypatch.setenv("BLOGICUM_SECRET_KEY", "test")
+    monkeypatch.setenv("BLOGICUM_ALLOWED_HOSTS", "blogicum.example")
+    settings_prod = importlib.reload(
+        importlib.import_module("blogicum.settings.prod")
+    )
+    loaders = settings_prod.TEMPLATES[0]["OPTIONS"]["loaders"]
+    assert loaders[0][0] == "django.template.loaders.cached.Loader"
+    assert settings_prod.DEBUG is False
+    with override_settings(
+        TEMPLATES=settings_prod.TEMPLATES, BLOG_WARM_TEMPLATES=True
+    ):
+        warm_templates()
+        loader = engines["django"].engine.template_loaders[0]
+        assert "blog/index.html" in loader.get_template_cache, (
+            "Убедитесь, что при старте все шаблоны попадают в кэш"
+            " кэширующего загрузчика."
+        )
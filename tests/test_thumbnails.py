@@ -0,0 +1,129 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import FileSystemStorage
+from PIL import Image
+
+from blog.images import thumbnail_name, thumbnail_widths
+from blog.tasks import claim_tasks, run_task
+
+
+def run_queued_tasks():
+    for queued in claim_tasks(limit=100):
+        run_task(queued)
+
+
+@pytest.mark.django_db
+def test_thumbnails_built_on_upload(client, mixer, published_category):
+    post = mixer.blend(
+        "blog.Post", category=published_category, is_published=True,
+        image=_image("wide.jpg", "JPEG", width=2000)
+    )
+    image = post.image
+    assert not image.storage.exists(
+        thumbnail_name(image.name, thumbnail_widths()["feed"], "jpeg")
+    ), "Убедитесь, что изображение обрабатывается вне потока запроса."
+    assert f'src="{image.url}"' in client.get("/").content.decode()
+
+    run_queued_tasks()
+    storage = image.storage
+    for width in thumbnail_widths().values():
+        for fmt in ("webp", "jpeg"):
+            name = thumbnail_name(image.name, width, fmt)
+            assert storage.exists(name), (
+                "Убедитесь, что при загрузке изображения поста строятся его"
+                f" уменьшенные копии (нет `{name}`)."
+            )
+            with storage.open(name) as fh:
+                assert Image.open(fh).width == width
+
+    content = client.get("/").content.decode()
+    feed_thumb = thumbnail_name(image.name, thumbnail_widths()["feed"], "jpeg")
+    assert 'type="image/webp"' in content and "srcset=" in content
+    assert f'src="{storage.url(feed_thumb)}"' in content, (
+        "Убедитесь, что в ленте выводится уменьшенная копия изображения."
+    )
+
+
+@pytest.mark.django_db
+def test_small_image_is_not_described_as_wider(
+        client, post_with_published_location):
+    run_queued_tasks()
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert post.thumbnails == [100], (
+        "Убедитесь, что для изображения уже настроенных ширин записывается"
+        " настоящая ширина копии."
+    )
+    content = client.get("/").content.decode()
+    for width in thumbnail_widths().values():
+        assert f" {width}w" not in content, (
+            "Убедитесь, что srcset не описывает копию небольшого"
+            f" изображения шириной {width}w."
+        )
+    assert " 100w" in content
+
+
+@pytest.mark.django_db
+def test_thumbnails_removed_with_image(post_with_published_location):
+    run_queued_tasks()
+    post = post_with_published_location
+    post.refresh_from_db()
+    name, storage = post.image.name, post.image.storage
+    thumbnail = thumbnail_name(name, post.thumbnails[0], "webp")
+    assert storage.exists(thumbnail)
+    post.image = None
+    post.save()
+    assert not storage.exists(thumbnail)
+
+
+def _image(name, fmt, width=100):
+    buffer = BytesIO()
+    Image.new("RGB", (width, 100)).save(buffer, format=fmt)
+    return ImageFile(buffer, name=name)
+
+
+@pytest.mark.django_db
+def test_thumbnails_of_same_stem_do_not_clash(mixer, published_category):
+    jpeg, png = (
+        mixer.blend(
+            "blog.Post", category=published_category, is_published=True,
+            image=_image(name, fmt)
+        )
+        for name, fmt in (("same.jpg", "JPEG"), ("same.png", "PNG"))
+    )
+    run_queued_tasks()
+    jpeg.refresh_from_db()
+    png.refresh_from_db()
+    width = png.thumbnails[0]
+    assert thumbnail_name(jpeg.image.name, width, "webp") != thumbnail_name(
+        png.image.name, width, "webp"
+    ), (
+        "Убедитесь, что у изображений с одинаковым именем и разными"
+        " расширениями разные уменьшенные копии."
+    )
+    name, storage = png.image.name, png.image.storage
+    jpeg.delete()
+    assert storage.exists(thumbnail_name(name, width, "webp")), (
+        "Убедитесь, что удаление поста не удаляет копии чужого изображения."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_does_not_probe_storage(
+        client, monkeypatch, post_with_published_location):
+    run_queued_tasks()
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.thumbnails == [100], (
+        "Убедитесь, что построенные копии записываются в пост."
+    )
+
+    def exists(self, name):
+        raise AssertionError(
+            "Убедитесь, что вывод карточки поста не проверяет наличие"
+            " файлов в хранилище."
+        )
+
+    monkeypatch.setattr(FileSystemStorage, "exists", exists)
+    assert "srcset=" in client.get("/").content.decode()
@@ -0,0 +1,114 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import UserStats
+
+
+def _stats(user):
+    return UserStats.objects.get(user=user)
+
+
+@pytest.mark.django_db
+def test_user_stats_follow_posts_and_comments(mixer, user, another_user):
+    stats = _stats(user)
+    assert (stats.post_count, stats.comment_count, stats.last_post_at) == (
+        0, 0, None
+    ), "Убедитесь, что у нового пользователя создается пустая статистика."
+
+    first = mixer.blend("blog.Post", author=user, is_published=True)
+    second = mixer.blend("blog.Post", author=user, is_published=False)
+    mixer.cycle(2).blend("blog.Comment", post=first, author=user)
+    stats = _stats(user)
+    assert (
+        stats.post_count, stats.published_count, stats.comment_count
+    ) == (2, 1, 2), (
+        "Убедитесь, что статистика учитывает новые посты и комментарии."
+    )
+    assert stats.last_post_at == second.created_at
+
+    second.is_published = True
+    second.save()
+    assert _stats(user).published_count == 2, (
+        "Убедитесь, что публикация поста увеличивает число опубликованных."
+    )
+
+    second.author = another_user
+    second.save()
+    stats, other = _stats(user), _stats(another_user)
+    assert (stats.post_count, stats.published_count) == (1, 1)
+    assert (other.post_count, other.published_count) == (1, 1), (
+        "Убедитесь, что при смене автора пост переходит в статистику"
+        " нового автора."
+    )
+    assert stats.last_post_at == first.created_at
+
+    first.delete()
+    stats = _stats(user)
+    assert (
+        stats.post_count, stats.published_count, stats.comment_count,
+        stats.last_post_at
+    ) == (0, 0, 0, None), (
+        "Убедитесь, что удаление поста вместе с комментариями обновляет"
+        " статистику."
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_user_stats(mixer, user):
+    post = mixer.blend("blog.Post", author=user, is_published=True)
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    UserStats.objects.all().delete()
+
+    call_command("rebuild_user_stats", stdout=StringIO())
+    stats = _stats(user)
+    assert (
+        stats.post_count, stats.published_count, stats.comment_count,
+        stats.last_post_at
+    ) == (1, 1, 3, post.created_at), (
+        "Убедитесь, что команда `rebuild_user_stats` создает и"
+        " пересчитывает статистику пользователей."
+    )
+
+
+@pytest.mark.django_db
+def test_profile_loads_user_with_stats(mixer, user, user_client):
+    mixer.cycle(3).blend("blog.Post", author=user, is_published=True)
+    url = f"/profile/{user.username}/"
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(url)
+    content = response.content.decode()
+    assert "Публикаций: 3" in content and "Всего постов: 3" in content
+    user_queries = [
+        q["sql"] for q in ctx.captured_queries
+        if '"blog_userstats"' in q["sql"]
+    ]
+    assert len(user_queries) == 1 and '"auth_user"' in user_queries[0], (
+        "Убедитесь, что профиль загружает пользователя и его статистику"
+        " одним запросом."
+    )
+    assert not [
+        q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]
+    ], (
+        "Убедитесь, что автору профиля число его постов берется из"
+        " статистики, а не из COUNT."
+    )
+
+
+@pytest.mark.django_db
+def test_profile_hides_post_counters_from_visitors(
+        mixer, user, another_user_client):
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    mixer.blend(
+        "blog.Post", author=user, is_published=True, category=hidden_category
+    )
+    content = another_user_client.get(
+        f"/profile/{user.username}/"
+    ).content.decode()
+    assert "Публикаций:" not in content, (
+        "Убедитесь, что посетитель профиля не видит число публикаций"
+        " автора: в нем учтены скрытые от него посты."
+    )